@@ -0,0 +1,14 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+{
+    "name": "HR Holidays Calendar Stages",
+    "summary": "Transform the attendance intervals of calendars in one pass",
+    "version": "13.0.1.0.0",
+    "category": "Human Resources",
+    "website": "https://github.com/OCA/hr-holidays",
+    "author": "Odoo Community Association (OCA)",
+    "license": "AGPL-3",
+    "depends": ["resource"],
+    "data": [],
+    "installable": True,
+}
@@ -0,0 +1 @@
+from . import resource_calendar
@@ -0,0 +1,117 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+import threading
+from contextlib import contextmanager
+
+from odoo import models
+
+from odoo.addons.resource.models.resource import Intervals
+
+# Stacks of (cursor, resource IDs, value) by policy name, for the running thread
+_calendar_policies = threading.local()
+
+# Policy set while the outermost attendance intervals computation runs
+STAGES_RUNNING = "stages_running"
+
+
+@contextmanager
+def _push_policy(cr, name, value, resource_ids=None):
+    stack = _calendar_policies.__dict__.setdefault(name, [])
+    stack.append((cr, resource_ids, value))
+    try:
+        yield
+    finally:
+        stack.pop()
+
+
+class ResourceCalendar(models.Model):
+    _inherit = "resource.calendar"
+
+    @contextmanager
+    def _calendar_policy(self, name, value, resources=None):
+        """Set a policy read by the calendar computations done within the block.
+
+        The policy is scoped to the cursor of the environment and, when given,
+        to some resources, so that computations of other resources within the
+        block are not affected. Pending computations are flushed before
+        entering the block, so that they don't run under the policy.
+        :param name: name of the policy
+        :param value: value of the policy
+        :param resources: resource.resource records the policy applies to,
+                          all the resources if not set
+        """
+        self.flush()
+        resource_ids = None if resources is None else frozenset(resources.ids)
+        with _push_policy(self.env.cr, name, value, resource_ids):
+            yield
+
+    def _get_calendar_policy(self, name, resource_id=None):
+        """
+        Returns the value of the innermost policy set for the cursor
+        :param name: name of the policy
+        :param resource_id: ID of the resource the policy must apply to. If not
+                            set, only the policies of all resources are read.
+        :return: value of the policy, None if not set
+        """
+        for cr, resource_ids, value in reversed(getattr(_calendar_policies, name, ())):
+            if cr is not self.env.cr:
+                continue
+            if resource_ids is None or resource_id in resource_ids:
+                return value
+        return None
+
+    def _get_attendance_intervals_stages(self):
+        """Stages applied to the attendance intervals of the resources, as a
+        list of (sequence, method name) run by increasing sequence.
+
+        Each method is called with (start_dt, end_dt, resources, tz) and
+        returns a dict {resource_id: function}, or None when the stage does
+        not apply. A function receives the list of interval items of its
+        resource and returns the list to use instead, or the very same list
+        when it changes nothing.
+        """
+        return []
+
+    def _apply_attendance_intervals_transforms(self, intervals, resources, transforms):
+        """Run the transforms over the interval items of each resource, only
+        building an Intervals for the resources actually changed. The given
+        intervals are left untouched.
+        :param transforms: list of dict {resource_id: function}, or None
+        :return: dict {resource_id: Intervals}
+        """
+        transforms = [functions for functions in transforms if functions]
+        if not transforms or not resources:
+            return intervals
+        result = intervals
+        for resource in resources:
+            items = original_items = intervals[resource.id]._items
+            for functions in transforms:
+                function = functions.get(resource.id)
+                if function:
+                    items = function(items)
+            if items is not original_items:
+                if result is intervals:
+                    result = dict(intervals)
+                result[resource.id] = Intervals(items)
+        return result
+
+    def _attendance_intervals_batch(
+        self, start_dt, end_dt, resources=None, domain=None, tz=None
+    ):
+        if self._get_calendar_policy(STAGES_RUNNING):
+            # Nested computation, from a stage or another override: the
+            # outermost call runs the stages
+            return super()._attendance_intervals_batch(
+                start_dt, end_dt, resources=resources, domain=domain, tz=tz
+            )
+        with _push_policy(self.env.cr, STAGES_RUNNING, True):
+            res = super()._attendance_intervals_batch(
+                start_dt, end_dt, resources=resources, domain=domain, tz=tz
+            )
+            if not resources:
+                return res
+            transforms = [
+                getattr(self, method)(start_dt, end_dt, resources, tz)
+                for _sequence, method in sorted(self._get_attendance_intervals_stages())
+            ]
+        return self._apply_attendance_intervals_transforms(res, resources, transforms)
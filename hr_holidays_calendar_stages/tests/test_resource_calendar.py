@@ -0,0 +1,85 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from datetime import datetime
+from unittest.mock import patch
+
+from pytz import utc
+
+from odoo.tests import common
+
+
+class TestResourceCalendar(common.SavepointCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.calendar = cls.env.ref("resource.resource_calendar_std")
+        cls.resource = cls.env["resource.resource"].create(
+            {"name": "Resource", "calendar_id": cls.calendar.id, "tz": "UTC"}
+        )
+        cls.start_dt = datetime(2021, 1, 4, tzinfo=utc)  # Monday
+        cls.end_dt = datetime(2021, 1, 10, 23, 59, 59, tzinfo=utc)  # Sunday
+
+    def _get_intervals(self, stages):
+        calendar_class = type(self.calendar)
+        with patch.object(
+            calendar_class, "_get_attendance_intervals_stages", lambda self: stages
+        ):
+            return self.calendar._attendance_intervals_batch(
+                self.start_dt, self.end_dt, self.resource
+            )[self.resource.id]
+
+    def test_stages_order(self):
+        calls = []
+
+        def _stage(name):
+            def _function(items):
+                calls.append(name)
+                return items[1:]
+
+            return lambda *args: {self.resource.id: _function}
+
+        raw_intervals = self._get_intervals([])
+        calendar_class = type(self.calendar)
+        with patch.object(
+            calendar_class, "_test_stage_1", _stage("first"), create=True
+        ), patch.object(calendar_class, "_test_stage_2", _stage("second"), create=True):
+            intervals = self._get_intervals(
+                [(20, "_test_stage_2"), (10, "_test_stage_1")]
+            )
+        self.assertEqual(calls, ["first", "second"])
+        self.assertEqual(list(intervals), list(raw_intervals)[2:])
+
+    def test_stage_unchanged(self):
+        res = self.calendar._attendance_intervals_batch(
+            self.start_dt, self.end_dt, self.resource
+        )
+        transforms = [{self.resource.id: lambda items: items}, None]
+        self.assertIs(
+            self.calendar._apply_attendance_intervals_transforms(
+                res, self.resource, transforms
+            ),
+            res,
+        )
+
+    def test_calendar_policy_scope(self):
+        other_resource = self.resource.copy({"name": "Other resource"})
+        calendar = self.calendar
+        self.assertIsNone(calendar._get_calendar_policy("test_policy"))
+        with calendar._calendar_policy("test_policy", True):
+            self.assertTrue(calendar._get_calendar_policy("test_policy"))
+            with calendar._calendar_policy(
+                "test_policy", False, resources=self.resource
+            ):
+                self.assertFalse(
+                    calendar._get_calendar_policy("test_policy", self.resource.id)
+                )
+                self.assertTrue(
+                    calendar._get_calendar_policy("test_policy", other_resource.id)
+                )
+                self.assertTrue(calendar._get_calendar_policy("test_policy"))
+        self.assertIsNone(calendar._get_calendar_policy("test_policy"))
+        with calendar._calendar_policy("test_policy", True):
+            # Other cursors are not affected
+            with self.registry.cursor() as cr:
+                other_calendar = calendar.with_env(calendar.env(cr=cr))
+                self.assertIsNone(other_calendar._get_calendar_policy("test_policy"))
@@ -7,7 +7,7 @@
     "author": "Onestein, Odoo Community Association (OCA)",
     "website": "https://github.com/OCA/hr-holidays",
     "category": "Human Resources",
-    "version": "13.0.1.0.0",
+    "version": "13.0.1.1.0",
     "license": "AGPL-3",
     "depends": ["hr_holidays"],
     "data": ["views/hr_leave_type.xml", "views/hr_leave.xml"],
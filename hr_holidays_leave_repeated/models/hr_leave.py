@@ -1,11 +1,77 @@
 # Copyright 2016-2019 Onestein (<https://www.onestein.eu>)
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
+from bisect import bisect_right
+from datetime import timedelta
+
 from dateutil.relativedelta import relativedelta
+from pytz import utc
 
 from odoo import _, api, fields, models
 from odoo.exceptions import UserError, ValidationError
 
+from odoo.addons.resource.models.resource import Intervals
+
+# Number of days of working intervals loaded at once for repeating leaves
+HORIZON_CHUNK_DAYS = 366
+
+
+class WorkHorizon(object):
+    """Attendance and working intervals of a calendar, loaded by chunks of
+    HORIZON_CHUNK_DAYS days, for counting the work hours of many periods in
+    memory, like `resource.calendar.get_work_hours_count` does.
+    """
+
+    def __init__(self, calendar, start_dt):
+        self.calendar = calendar
+        self.start_dt = self.end_dt = self._localize(start_dt)
+        self.attendances = Intervals()
+        self.work = Intervals()
+        self.attendance_items = []
+        self.attendance_stops = []
+        self.work_items = []
+        self.work_stops = []
+
+    @staticmethod
+    def _localize(dt):
+        return dt if dt.tzinfo else dt.replace(tzinfo=utc)
+
+    def _extend(self, end_dt):
+        if end_dt <= self.end_dt:
+            return
+        while self.end_dt < end_dt:
+            stop_dt = self.end_dt + timedelta(days=HORIZON_CHUNK_DAYS)
+            self.attendances |= self.calendar._attendance_intervals(
+                self.end_dt, stop_dt
+            )
+            self.work |= self.calendar._work_intervals(self.end_dt, stop_dt)
+            self.end_dt = stop_dt
+        self.attendance_items = list(self.attendances)
+        self.attendance_stops = [stop for _start, stop, _meta in self.attendance_items]
+        self.work_items = list(self.work)
+        self.work_stops = [stop for _start, stop, _meta in self.work_items]
+
+    def get_work_hours_count(self, start_dt, end_dt, compute_leaves=True):
+        start_dt = self._localize(start_dt)
+        end_dt = self._localize(end_dt)
+        if start_dt < self.start_dt:
+            return self.calendar.get_work_hours_count(
+                start_dt, end_dt, compute_leaves=compute_leaves
+            )
+        self._extend(end_dt)
+        if compute_leaves:
+            items, stops = self.work_items, self.work_stops
+        else:
+            items, stops = self.attendance_items, self.attendance_stops
+        seconds = 0.0
+        # Intervals are sorted and disjoint: skip the ones ending before start
+        index = bisect_right(stops, start_dt)
+        while index < len(items) and items[index][0] < end_dt:
+            start, stop, _meta = items[index]
+            seconds += (min(stop, end_dt) - max(start, start_dt)).total_seconds()
+            index += 1
+        return seconds / 3600
+
 
 class HrLeave(models.Model):
     _inherit = "hr.leave"
@@ -26,17 +92,24 @@ class HrLeave(models.Model):
     repeat_end_date = fields.Date(default=lambda self: fields.Date.today())
 
     @api.model
-    def _update_repeated_workday_dates(self, employee, from_dt, to_dt, days):
+    def _get_repeated_work_horizon(self, employee, from_dt):
+        return WorkHorizon(employee.resource_calendar_id, from_dt)
+
+    @api.model
+    def _update_repeated_workday_dates(
+        self, employee, from_dt, to_dt, days, horizon=None
+    ):
         user = self.env.user
-        calendar = employee.resource_calendar_id
+        if horizon is None:
+            horizon = self._get_repeated_work_horizon(employee, from_dt)
         orig_from_dt = fields.Datetime.context_timestamp(user, from_dt)
         orig_to_dt = fields.Datetime.context_timestamp(user, to_dt)
-        work_hours = calendar.get_work_hours_count(from_dt, to_dt, compute_leaves=False)
+        work_hours = horizon.get_work_hours_count(from_dt, to_dt, compute_leaves=False)
         while work_hours:
             from_dt = from_dt + relativedelta(days=days)
             to_dt = to_dt + relativedelta(days=days)
 
-            new_work_hours = calendar.get_work_hours_count(
+            new_work_hours = horizon.get_work_hours_count(
                 from_dt, to_dt, compute_leaves=True
             )
             if new_work_hours and work_hours <= new_work_hours:
@@ -85,7 +158,7 @@ class HrLeave(models.Model):
         }
 
     @api.model
-    def _update_repeated_leave_vals(self, vals, employee):
+    def _update_repeated_leave_vals(self, vals, employee, horizon=None):
         vals_dict = self._get_repeated_vals_dict()
         param_dict = vals_dict[vals.get("repeat_every")]
         from_dt = fields.Datetime.from_string(vals.get("date_from"))
@@ -96,7 +169,7 @@ class HrLeave(models.Model):
             raise UserError(param_dict["user_error_msg"])
 
         from_dt, to_dt = self._update_repeated_workday_dates(
-            employee, from_dt, to_dt, param_dict["days"]
+            employee, from_dt, to_dt, param_dict["days"], horizon=horizon
         )
 
         vals["request_date_from"] = vals["date_from"] = from_dt
@@ -105,7 +178,11 @@ class HrLeave(models.Model):
         return vals
 
     @api.model
-    def create_repeated_handler(self, vals, employee):
+    def _prepare_repeated_leaves_vals(self, vals, employee):
+        """Compute the values of all the occurrences following a repeated leave.
+        :return: list of dict
+        """
+
         def _check_repeating(count, vals):
             repeat_mode = vals.get("repeat_mode", "times")
             if repeat_mode == "times" and count < vals.get("repeat_limit", 0):
@@ -115,22 +192,40 @@ class HrLeave(models.Model):
                 return True
             return False
 
+        vals_list = []
         count = 1
-        vals = self._update_repeated_leave_vals(vals, employee)
+        # Working intervals are loaded once for the whole series
+        horizon = self._get_repeated_work_horizon(
+            employee, fields.Datetime.to_datetime(vals.get("date_from"))
+        )
+        vals = self._update_repeated_leave_vals(dict(vals), employee, horizon)
         while _check_repeating(count, vals):
-            self.with_context(skip_create_handler=True).create(vals)
+            vals_list.append(vals)
             count += 1
-            vals = self._update_repeated_leave_vals(vals, employee)
+            vals = self._update_repeated_leave_vals(dict(vals), employee, horizon)
+        return vals_list
 
     @api.model
-    def create(self, vals):
-        res = super().create(vals)
-        skip_create_handler = self.env.context.get("skip_create_handler")
-        all_vals_set = vals.get("repeat_every") and vals.get("repeat_mode")
-        if not skip_create_handler and all_vals_set:
+    def create_repeated_handler(self, vals, employee):
+        return self.with_context(skip_create_handler=True).create(
+            self._prepare_repeated_leaves_vals(vals, employee)
+        )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        res = super().create(vals_list)
+        if self.env.context.get("skip_create_handler"):
+            return res
+        repeated_vals_list = []
+        for vals in vals_list:
+            if not (vals.get("repeat_every") and vals.get("repeat_mode")):
+                continue
             employee = self.env["hr.employee"].browse(vals.get("employee_id"))
             if employee.resource_calendar_id:
-                self.create_repeated_handler(vals, employee)
+                repeated_vals_list += self._prepare_repeated_leaves_vals(vals, employee)
+        if repeated_vals_list:
+            # All the occurrences are created, and checked, at once
+            self.with_context(skip_create_handler=True).create(repeated_vals_list)
         return res
 
     @api.constrains("repeat_limit", "repeat_end_date")
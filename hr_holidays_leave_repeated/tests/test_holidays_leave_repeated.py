@@ -264,3 +264,65 @@ class TestHolidaysLeaveRepeated(common.TransactionCase):
                     "employee_id": self.employee_5.id,
                 }
             )
+
+    def test_10_create_several_repeated_leaves(self):
+        employee_6 = self.env["hr.employee"].create(
+            {"name": "Employee 6", "resource_calendar_id": self.calendar.id}
+        )
+        employees = self.employee_5 | employee_6
+        leaves = self.env["hr.leave"].create(
+            [
+                {
+                    "holiday_status_id": self.status_1.id,
+                    "holiday_type": "employee",
+                    "repeat_every": "week",
+                    "repeat_mode": "times",
+                    "repeat_limit": 3,
+                    "date_from": self.date_start + timedelta(days=1),
+                    "date_to": self.date_end + timedelta(days=1),
+                    "employee_id": employee.id,
+                }
+                for employee in employees
+            ]
+        )
+        self.assertEqual(len(leaves), 2)
+        for employee in employees:
+            repeated_leaves = self.env["hr.leave"].search(
+                [
+                    ("holiday_status_id", "=", self.status_1.id),
+                    ("employee_id", "=", employee.id),
+                    ("date_from", ">", self.date_start + timedelta(days=7)),
+                ]
+            )
+            self.assertEqual(
+                sorted(repeated_leaves.mapped("date_from")),
+                [
+                    self.date_start + timedelta(days=8),
+                    self.date_start + timedelta(days=15),
+                ],
+            )
+
+    def test_11_work_horizon(self):
+        self.env["resource.calendar.leaves"].create(
+            {
+                "name": "Global leave",
+                "calendar_id": self.calendar.id,
+                "date_from": datetime(2016, 12, 13, 0, 0, 0),
+                "date_to": datetime(2016, 12, 13, 23, 59, 59),
+            }
+        )
+        horizon = self.env["hr.leave"]._get_repeated_work_horizon(
+            self.employee_1, self.date_start
+        )
+        for days in (0, 1, 8, 400):
+            date_from = self.date_start + timedelta(days=days)
+            date_to = self.date_end + timedelta(days=days)
+            for compute_leaves in (True, False):
+                self.assertAlmostEqual(
+                    horizon.get_work_hours_count(
+                        date_from, date_to, compute_leaves=compute_leaves
+                    ),
+                    self.calendar.get_work_hours_count(
+                        date_from, date_to, compute_leaves=compute_leaves
+                    ),
+                )
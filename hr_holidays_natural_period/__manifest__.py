@@ -4,13 +4,13 @@
 {
     "name": "Holidays natural period",
     "summary": "Apply natural days in holidays",
-    "version": "13.0.1.0.3",
+    "version": "13.0.1.1.0",
     "category": "Human Resources",
     "website": "https://github.com/OCA/hr-holidays",
     "author": "Tecnativa, Odoo Community Association (OCA)",
     "license": "AGPL-3",
     "installable": True,
-    "depends": ["hr_holidays"],
+    "depends": ["hr_holidays", "hr_holidays_calendar_stages"],
     "data": [],
     "maintainers": ["victoralmau"],
 }
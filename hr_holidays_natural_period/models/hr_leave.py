@@ -1,7 +1,9 @@
 # Copyright 2020 Tecnativa - Víctor Martínez
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
-from odoo import api, models
+from pytz import timezone, utc
+
+from odoo import api, fields, models
 
 
 class HrLeave(models.Model):
@@ -13,13 +15,72 @@ class HrLeave(models.Model):
         if (self._origin.holiday_status_id.request_unit == "natural_day") != (
             self.holiday_status_id.request_unit == "natural_day"
         ):
-            self.with_context(natural_period=True)._onchange_leave_dates()
+            self._onchange_leave_dates()
         return res
 
     def _get_number_of_days(self, date_from, date_to, employee_id):
-        instance = self.with_context(
-            natural_period=bool(self.holiday_status_id.request_unit == "natural_day")
+        natural_period = self.holiday_status_id.request_unit == "natural_day"
+        if (
+            natural_period
+            and employee_id
+            and not self.request_unit_half
+            and not self._has_natural_period_global_leaves(
+                date_from, date_to, employee_id
+            )
+        ):
+            return self._get_natural_days_count(date_from, date_to, employee_id)
+        resources = self.env["hr.employee"].browse(employee_id).resource_id or None
+        with self.env["resource.calendar"]._natural_period(
+            natural_period, resources=resources
+        ):
+            return super()._get_number_of_days(date_from, date_to, employee_id)
+
+    def _has_natural_period_global_leaves(self, date_from, date_to, employee_id):
+        """Whether global time off of the employee calendar overlaps the period,
+        in which case the days must be counted through the calendar.
+        """
+        calendar = self.env["hr.employee"].browse(employee_id).resource_calendar_id
+        if not calendar or not date_from or not date_to:
+            return False
+        return bool(
+            self.env["resource.calendar.leaves"].search_count(
+                [
+                    ("calendar_id", "=", calendar.id),
+                    ("resource_id", "=", False),
+                    ("time_type", "=", "leave"),
+                    ("date_from", "<", date_to),
+                    ("date_to", ">", date_from),
+                ]
+            )
         )
-        return super(HrLeave, instance)._get_number_of_days(
-            date_from, date_to, employee_id
+
+    def _get_natural_days_count(self, date_from, date_to, employee_id):
+        """Count the calendar days between two datetimes in the timezone of
+        the employee, without computing any attendance.
+        """
+        date_from = fields.Datetime.to_datetime(date_from)
+        date_to = fields.Datetime.to_datetime(date_to)
+        if not date_from or not date_to or date_to <= date_from:
+            return 0
+        employee = self.env["hr.employee"].browse(employee_id)
+        tz = timezone(employee.tz or "UTC")
+        start_date = utc.localize(date_from).astimezone(tz).date()
+        end_date = utc.localize(date_to).astimezone(tz).date()
+        excluded_dates = self._get_natural_period_excluded_dates(
+            start_date, end_date, employee_id
+        )
+        return (
+            (end_date - start_date).days
+            + 1
+            - len([day for day in excluded_dates if start_date <= day <= end_date])
         )
+
+    def _get_natural_period_excluded_dates(self, start_date, end_date, employee_id):
+        """Dates not counted as natural days, to be extended by other modules,
+        like the public holidays.
+        :return: set of dates
+        """
+        parent = getattr(super(), "_get_natural_period_excluded_dates", None)
+        if parent:
+            return set(parent(start_date, end_date, employee_id))
+        return set()
@@ -1,53 +1,96 @@
 # Copyright 2020-2021 Tecnativa - Víctor Martínez
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
+from functools import partial
 
-from dateutil import rrule
 from pytz import timezone
 
 from odoo import models
 
-from odoo.addons.resource.models.resource import Intervals
+NATURAL_PERIOD = "natural_period"
+
+
+def _fill_natural_days(items, days, tz, attendance):
+    """Add a whole day interval item for every day without any item."""
+    covered_days = {item[0].date() for item in items}
+    missing_items = [
+        (
+            datetime.combine(day, time.min).replace(tzinfo=tz),
+            datetime.combine(day, time.max).replace(tzinfo=tz),
+            attendance,
+        )
+        for day in days
+        if day not in covered_days
+    ]
+    if not missing_items:
+        return items
+    return items + missing_items
 
 
 class ResourceCalendar(models.Model):
     _inherit = "resource.calendar"
 
-    def _exist_interval_in_date(self, intervals, date):
-        for interval in intervals:
-            if interval[0].date() == date:
-                return True
-        return False
+    def _natural_period(self, natural_period=True, resources=None):
+        """Count natural days in the attendances computed within the block, see
+        ``_calendar_policy``.
+        :param resources: resource.resource records counting natural days, all
+                          the resources if not set
+        """
+        return self._calendar_policy(
+            NATURAL_PERIOD, bool(natural_period), resources=resources
+        )
+
+    def _is_natural_period(self, resource_id=None):
+        natural_period = self._get_calendar_policy(NATURAL_PERIOD, resource_id)
+        if natural_period is not None:
+            return natural_period
+        return bool(self.env.context.get("natural_period"))
+
+    def _get_natural_period_transforms(self, start_dt, end_dt, resources):
+        """:return: dict {resource_id: function adding a whole day interval
+        for every day of the period without attendance}"""
+        if end_dt < start_dt:
+            return {}
+        start_date = start_dt.date()
+        days = [
+            start_date + timedelta(days=n) for n in range((end_dt - start_dt).days + 1)
+        ]
+        empty_attendance = self.env["resource.calendar.attendance"]
+        timezones = {}
+        transforms = {}
+        for resource in resources:
+            if resource.tz not in timezones:
+                timezones[resource.tz] = timezone(resource.tz)
+            transforms[resource.id] = partial(
+                _fill_natural_days,
+                days=days,
+                tz=timezones[resource.tz],
+                attendance=empty_attendance,
+            )
+        return transforms
+
+    def _natural_period_stage(self, start_dt, end_dt, resources, tz):
+        resources = resources.filtered(
+            lambda resource: self._is_natural_period(resource.id)
+        )
+        if not resources:
+            return None
+        return self._get_natural_period_transforms(start_dt, end_dt, resources)
 
     def _natural_period_intervals_batch(self, start_dt, end_dt, intervals, resources):
-        for resource in resources or []:
-            interval_resource = intervals[resource.id]
-            tz = timezone(resource.tz)
-            attendances = []
-            if len(interval_resource._items) > 0:
-                attendances = interval_resource._items
-            for day in rrule.rrule(rrule.DAILY, dtstart=start_dt, until=end_dt):
-                exist_interval = self._exist_interval_in_date(attendances, day.date())
-                if not exist_interval:
-                    attendances.append(
-                        (
-                            datetime.combine(day.date(), time.min).replace(tzinfo=tz),
-                            datetime.combine(day.date(), time.max).replace(tzinfo=tz),
-                            self.env["resource.calendar.attendance"],
-                        )
-                    )
-            intervals[resource.id] = Intervals(attendances)
-        return intervals
-
-    def _attendance_intervals_batch(
-        self, start_dt, end_dt, resources=None, domain=None, tz=None
-    ):
-        res = super()._attendance_intervals_batch(
-            start_dt=start_dt, end_dt=end_dt, resources=resources, domain=domain, tz=tz
+        """Add a whole day interval for every day of the period without
+        attendance. The given intervals are left untouched.
+        :return: dict {resource_id: Intervals}
+        """
+        if not resources:
+            return intervals
+        transforms = self._get_natural_period_transforms(start_dt, end_dt, resources)
+        return self._apply_attendance_intervals_transforms(
+            intervals, resources, [transforms]
         )
-        if self.env.context.get("natural_period"):
-            return self._natural_period_intervals_batch(
-                start_dt, end_dt, res, resources
-            )
-        return res
+
+    def _get_attendance_intervals_stages(self):
+        return super()._get_attendance_intervals_stages() + [
+            (10, "_natural_period_stage")
+        ]
@@ -1,6 +1,10 @@
 # Copyright 2020 Tecnativa - Víctor Martínez
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
 
+from datetime import date, datetime
+
+from pytz import utc
+
 from odoo.tests import Form, common
 
 
@@ -61,3 +65,74 @@ class TestHrLeave(common.SavepointCase):
         leave_form.request_date_from = "2021-01-02"  # Saturday
         leave_form.request_date_to = "2021-01-04"  # Monday
         self.assertEquals(leave_form.number_of_days, 1)
+
+    def test_natural_period_intervals_batch(self):
+        calendar = self.employee.resource_calendar_id
+        resource = self.employee.resource_id
+        start_dt = datetime(2021, 1, 2, tzinfo=utc)  # Saturday
+        end_dt = datetime(2021, 1, 5, 23, 59, 59, tzinfo=utc)  # Tuesday
+        intervals = calendar._attendance_intervals_batch(start_dt, end_dt, resource)
+        items = list(intervals[resource.id]._items)
+        res = calendar._natural_period_intervals_batch(
+            start_dt, end_dt, intervals, resource
+        )
+        self.assertEqual(intervals[resource.id]._items, items)
+        self.assertEqual(
+            {item[0].date() for item in res[resource.id]},
+            {date(2021, 1, day) for day in range(2, 6)},
+        )
+
+    def test_natural_days_count(self):
+        self.employee.tz = "UTC"
+        leave = self.HrLeave.new({"holiday_status_id": self.leave_type.id})
+        self.assertEqual(
+            leave._get_number_of_days(
+                datetime(2021, 1, 2, 0, 0, 0),  # Saturday
+                datetime(2021, 1, 5, 23, 59, 59),  # Tuesday
+                self.employee.id,
+            ),
+            4,
+        )
+        self.assertEqual(
+            leave._get_number_of_days(
+                datetime(2021, 1, 5, 0, 0, 0),
+                datetime(2021, 1, 2, 0, 0, 0),
+                self.employee.id,
+            ),
+            0,
+        )
+
+    def test_natural_days_count_global_leaves(self):
+        self.employee.tz = "UTC"
+        self.env["resource.calendar.leaves"].create(
+            {
+                "name": "Global time off",
+                "calendar_id": self.employee.resource_calendar_id.id,
+                "date_from": datetime(2021, 1, 4, 0, 0, 0),  # Monday
+                "date_to": datetime(2021, 1, 4, 23, 59, 59),
+            }
+        )
+        leave = self.HrLeave.new({"holiday_status_id": self.leave_type.id})
+        self.assertEqual(
+            leave._get_number_of_days(
+                datetime(2021, 1, 2, 0, 0, 0),  # Saturday
+                datetime(2021, 1, 5, 23, 59, 59),  # Tuesday
+                self.employee.id,
+            ),
+            3,
+        )
+
+    def test_natural_period_stage(self):
+        calendar = self.employee.resource_calendar_id
+        resource = self.employee.resource_id
+        self.assertIn(
+            (10, "_natural_period_stage"), calendar._get_attendance_intervals_stages()
+        )
+        start_dt = datetime(2021, 1, 2, tzinfo=utc)  # Saturday
+        end_dt = datetime(2021, 1, 5, 23, 59, 59, tzinfo=utc)  # Tuesday
+        with calendar._natural_period():
+            intervals = calendar._attendance_intervals_batch(start_dt, end_dt, resource)
+        self.assertEqual(
+            {item[0].date() for item in intervals[resource.id]},
+            {date(2021, 1, day) for day in range(2, 6)},
+        )
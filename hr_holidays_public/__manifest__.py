@@ -3,7 +3,7 @@
 
 {
     "name": "HR Holidays Public",
-    "version": "13.0.3.0.6",
+    "version": "13.0.3.5.0",
     "license": "AGPL-3",
     "category": "Human Resources",
     "author": "Michael Telahun Makonnen, "
@@ -13,13 +13,16 @@
     "Odoo Community Association (OCA)",
     "summary": "Manage Public Holidays",
     "website": "https://github.com/OCA/hr-holidays",
-    "depends": ["hr_holidays"],
+    "depends": ["hr_holidays", "hr_holidays_calendar_stages"],
     "data": [
         "data/data.xml",
+        "data/ir_cron.xml",
         "security/ir.model.access.csv",
         "views/hr_holidays_public_view.xml",
         "views/hr_leave_type.xml",
         "wizards/holidays_public_next_year_wizard.xml",
+        "wizards/holidays_public_import_ics_wizard.xml",
+        "wizards/holidays_public_recompute_leaves_wizard.xml",
     ],
     "installable": True,
 }
@@ -0,0 +1,71 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+import hashlib
+
+from werkzeug.exceptions import BadRequest
+
+from odoo import fields, http
+from odoo.exceptions import UserError
+from odoo.http import request
+
+FEED_CONTENT_TYPES = {
+    "json": "application/json; charset=utf-8",
+    "ics": "text/calendar; charset=utf-8",
+}
+
+
+class HolidaysPublicController(http.Controller):
+    @http.route(
+        ["/hr_holidays_public/holidays.json", "/hr_holidays_public/holidays.ics",],
+        type="http",
+        auth="public",
+        methods=["GET"],
+    )
+    def holidays_feed(
+        self, country=None, state=None, date_from=None, date_to=None, **kwargs
+    ):
+        """Public holidays of a country (and state) between two dates, as JSON or
+        as an iCalendar feed. Dates default to the current year. Without country,
+        only the public holidays without country are returned.
+
+        The ETag only depends on the holidays version stamp and on the
+        parameters, so conditional requests of unchanged feeds are answered
+        with a 304 without reading any public holiday.
+        """
+        feed_format = request.httprequest.path.rsplit(".", 1)[-1]
+        holiday_model = request.env["hr.holidays.public"].sudo()
+        # Check and resolve the dates before any cache lookup, so the ETag
+        # changes with the default year and unbounded ranges are rejected
+        try:
+            start_dt, end_dt = holiday_model._get_holidays_feed_range(
+                date_from, date_to
+            )
+        except UserError as error:
+            raise BadRequest(str(error))
+        date_from = fields.Date.to_string(start_dt)
+        date_to = fields.Date.to_string(end_dt)
+        etag = hashlib.sha1(
+            repr(
+                (
+                    holiday_model._get_holidays_version(),
+                    feed_format,
+                    country,
+                    state,
+                    date_from,
+                    date_to,
+                )
+            ).encode()
+        ).hexdigest()
+        headers = [("ETag", '"%s"' % etag), ("Cache-Control", "no-cache")]
+        if request.httprequest.if_none_match.contains(etag):
+            response = request.make_response("", headers=headers)
+            response.status_code = 304
+            return response
+        try:
+            body = holiday_model._get_holidays_feed(
+                feed_format, country, state, date_from, date_to
+            )
+        except UserError as error:
+            raise BadRequest(str(error))
+        headers.append(("Content-Type", FEED_CONTENT_TYPES[feed_format]))
+        return request.make_response(body, headers=headers)
@@ -2,20 +2,40 @@
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
 import logging
+import time
 
 from odoo import SUPERUSER_ID, api
 
 _logger = logging.getLogger(__name__)
 
+CHUNK_SIZE = 1000
+
 
 def migrate(cr, version):
+    """Create the missing meetings by chunks, committing after each of them, so
+    an interrupted upgrade resumes with the holidays still without meeting."""
     with api.Environment.manage():
         env = api.Environment(cr, SUPERUSER_ID, {})
-        holidays_without_meeting = env["hr.holidays.public.line"].search(
-            [("meeting_id", "=", False)]
-        )
-        for holiday in holidays_without_meeting:
-            _logger.debug("Creating meeting for holiday: %s" % holiday.name)
-            holiday.meeting_id = env["calendar.event"].create(
-                holiday._prepare_holidays_meeting_values()
+        line_model = env["hr.holidays.public.line"]
+        domain = [("meeting_id", "=", False)]
+        total = line_model.search_count(domain)
+        done = 0
+        start = time.time()
+        while True:
+            holidays_without_meeting = line_model.search(
+                domain, limit=CHUNK_SIZE, order="id"
+            )
+            if not holidays_without_meeting:
+                break
+            holidays_without_meeting._create_holidays_meetings()
+            line_model.flush()
+            cr.commit()  # pylint: disable=invalid-commit
+            env.clear()
+            done += len(holidays_without_meeting)
+            elapsed = time.time() - start
+            _logger.info(
+                "Created meetings for %s/%s holidays (%.1f holidays/s)",
+                done,
+                total,
+                done / elapsed if elapsed else done,
             )
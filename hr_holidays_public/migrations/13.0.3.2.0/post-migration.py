@@ -0,0 +1,11 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import SUPERUSER_ID, api
+
+
+def migrate(cr, version):
+    with api.Environment.manage():
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        env["hr.holidays.public.bitmap"]._refresh_years(
+            env["hr.holidays.public"].search([]).mapped("year")
+        )
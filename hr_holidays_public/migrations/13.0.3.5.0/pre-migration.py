@@ -0,0 +1,16 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+
+def migrate(cr, version):
+    # Remove the duplicated bitmaps, so that the unique index can be created.
+    # They are all computed from the same public holiday lines.
+    cr.execute(
+        """
+        DELETE FROM hr_holidays_public_bitmap bitmap
+        USING hr_holidays_public_bitmap other
+        WHERE bitmap.id > other.id
+            AND bitmap.year = other.year
+            AND bitmap.country_id IS NOT DISTINCT FROM other.country_id
+            AND bitmap.state_id IS NOT DISTINCT FROM other.state_id
+        """
+    )
@@ -1,6 +1,11 @@
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
+from . import hr_employee
 from . import hr_leave
 from . import hr_leave_type
 from . import hr_holidays_public
+from . import hr_holidays_public_bitmap
+from . import hr_holidays_public_change
+from . import hr_holidays_public_rule
+from . import res_partner
 from . import resource_calendar
@@ -0,0 +1,78 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import api, fields, models
+
+
+class HrEmployee(models.Model):
+    _inherit = "hr.employee"
+
+    holidays_country_id = fields.Many2one(
+        "res.country",
+        string="Public Holidays Country",
+        compute="_compute_holidays_region",
+        store=True,
+        index=True,
+        help="Country of the work address, used for the public holidays.",
+    )
+    holidays_state_id = fields.Many2one(
+        "res.country.state",
+        string="Public Holidays State",
+        compute="_compute_holidays_region",
+        store=True,
+        index=True,
+        help="State of the work address, used for the public holidays.",
+    )
+
+    @api.depends("address_id.country_id", "address_id.state_id")
+    def _compute_holidays_region(self):
+        for employee in self:
+            employee.holidays_country_id = employee.address_id.country_id
+            employee.holidays_state_id = employee.address_id.state_id
+
+    def write(self, vals):
+        if "address_id" not in vals:
+            return super().write(vals)
+        regions = self._get_holidays_region_values()
+        res = super().write(vals)
+        self._holidays_region_changed(regions)
+        return res
+
+    def _get_holidays_region_values(self):
+        return {
+            employee.id: (
+                employee.holidays_country_id.id,
+                employee.holidays_state_id.id,
+            )
+            for employee in self
+        }
+
+    def _holidays_region_changed(self, old_regions):
+        """Recompute the in progress and future leaves of the employees whose
+        public holidays region is no longer the one given in `old_regions`.
+
+        All the leaves are recomputed in a single batch, the holidays of each
+        new region being loaded once through the public holidays cache. Leaves
+        that would exceed the allocation of their employee are left untouched,
+        so that changing an address never fails.
+        :param old_regions: dict {employee_id: (country_id, state_id)}
+        """
+        new_regions = self._get_holidays_region_values()
+        employees = self.filtered(
+            lambda employee: new_regions[employee.id] != old_regions.get(employee.id)
+        )
+        if not employees:
+            return
+        leaves = (
+            self.env["hr.leave"]
+            .sudo()
+            .search(
+                [
+                    ("employee_id", "in", employees.ids),
+                    ("holiday_type", "=", "employee"),
+                    ("date_to", ">=", fields.Datetime.now()),
+                    ("holiday_status_id.exclude_public_holidays", "=", True),
+                    ("state", "not in", ["cancel", "refuse"]),
+                ]
+            )
+        )
+        leaves._recompute_public_holidays_days(skip_exceeding=True)
@@ -2,10 +2,15 @@
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
 import datetime
+import json
+from collections import Counter, defaultdict
 from datetime import date
 
-from odoo import SUPERUSER_ID, _, api, fields, models
-from odoo.exceptions import ValidationError
+from odoo import SUPERUSER_ID, _, api, fields, models, tools
+from odoo.exceptions import UserError, ValidationError
+
+# Largest range of years served by a public holidays feed
+FEED_MAX_YEARS = 10
 
 
 class HrHolidaysPublic(models.Model):
@@ -18,20 +23,27 @@ class HrHolidaysPublic(models.Model):
     year = fields.Integer("Calendar Year", required=True, default=date.today().year)
     line_ids = fields.One2many("hr.holidays.public.line", "year_id", "Holiday Dates")
     country_id = fields.Many2one("res.country", "Country")
+    rule_ids = fields.One2many(
+        "hr.holidays.public.rule", "holiday_id", "Rules", copy=True
+    )
 
     @api.constrains("year", "country_id")
     def _check_year(self):
-        for line in self:
-            line._check_year_one()
-
-    def _check_year_one(self):
-        if self.search_count(
-            [
-                ("year", "=", self.year),
-                ("country_id", "=", self.country_id.id),
-                ("id", "!=", self.id),
-            ]
-        ):
+        self.flush(["year", "country_id"])
+        self.env.cr.execute(
+            """
+            SELECT 1
+            FROM hr_holidays_public holiday
+            JOIN hr_holidays_public other
+                ON other.year = holiday.year
+                AND other.country_id IS NOT DISTINCT FROM holiday.country_id
+                AND other.id != holiday.id
+            WHERE holiday.id IN %s
+            LIMIT 1
+            """,
+            (tuple(self.ids),),
+        )
+        if self.env.cr.fetchone():
             raise ValidationError(
                 _(
                     "You can't create duplicate public holiday per year and/or"
@@ -54,6 +66,349 @@ class HrHolidaysPublic(models.Model):
             result.append((rec.id, rec.display_name))
         return result
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        res = super().create(vals_list)
+        self._holidays_changed(res._get_holidays_bitmap_regions())
+        return res
+
+    def write(self, vals):
+        if not {"year", "country_id"} & set(vals):
+            return super().write(vals)
+        regions = self._get_holidays_bitmap_regions()
+        lines = self.mapped("line_ids")
+        Change = self.env["hr.holidays.public.change"]
+        if "country_id" in vals:
+            Change._record_lines(lines)
+        aggregated = "country_id" in vals and lines._is_aggregated_meetings_mode()
+        if aggregated:
+            keys = lines._get_holidays_meeting_keys()
+            meetings = lines.mapped("meeting_id")
+        res = super().write(vals)
+        if aggregated:
+            lines._sync_holidays_aggregated_meetings(
+                keys | lines._get_holidays_meeting_keys(), meetings
+            )
+        if "country_id" in vals:
+            Change._record_lines(lines)
+        self._holidays_changed(regions | self._get_holidays_bitmap_regions())
+        return res
+
+    def unlink(self):
+        regions = self._get_holidays_bitmap_regions()
+        self.env["hr.holidays.public.change"]._record_lines(self.mapped("line_ids"))
+        res = super().unlink()
+        self._holidays_changed(regions)
+        return res
+
+    def _get_holidays_bitmap_regions(self):
+        """:return: set of (year, country ID) tuples of the public holidays"""
+        return {(holiday.year, holiday.country_id.id or False) for holiday in self}
+
+    def action_generate_lines_from_rules(self):
+        self._generate_lines_from_rules()
+        return True
+
+    def _generate_lines_from_rules(self):
+        """Replace the lines generated from rules by the ones computed from the
+        current rules, creating all of them in a single batch.
+        :return: recordset of the created hr.holidays.public.line
+        """
+        self.mapped("line_ids").filtered("rule_id").unlink()
+        dates = self.mapped("rule_ids")._get_dates(self.mapped("year"))
+        vals_list = []
+        for holiday in self:
+            for rule in holiday.rule_ids:
+                rule_date = dates[rule.id].get(holiday.year)
+                if rule_date:
+                    line_vals = rule._prepare_line_values(rule_date)
+                    line_vals["year_id"] = holiday.id
+                    vals_list.append(line_vals)
+        return self.env["hr.holidays.public.line"].create(vals_list)
+
+    @api.model
+    @tools.ormcache()
+    def _get_holidays_version(self):
+        """
+        Returns a stamp computed from the content of all the public holiday
+        lines. It is cached like the holidays, so reading it costs no query once
+        warm, and any worker computing it gets the same value for the same data.
+        :return: string
+        """
+        self.flush()
+        self.env.cr.execute(
+            """
+            SELECT md5(string_agg(
+                concat_ws(
+                    '|', line.id, line.date, line.name, line.write_date,
+                    holiday.year, holiday.country_id,
+                    (
+                        SELECT string_agg(rel.state_id::text, ',' ORDER BY rel.state_id)
+                        FROM hr_holiday_public_state_rel rel
+                        WHERE rel.line_id = line.id
+                    )
+                ),
+                ';' ORDER BY line.id
+            ))
+            FROM hr_holidays_public_line line
+            JOIN hr_holidays_public holiday ON holiday.id = line.year_id
+            """
+        )
+        return self.env.cr.fetchone()[0] or ""
+
+    @api.model
+    def _get_holidays_feed(
+        self,
+        feed_format,
+        country_code=None,
+        state_code=None,
+        date_from=None,
+        date_to=None,
+    ):
+        """
+        Returns the public holidays of a region between two dates as a feed
+        :param feed_format: "json" or "ics"
+        :param country_code: code of the country. If not set, only the
+                             holidays without country are returned.
+        :param state_code: code of the country state
+        :param date_from: first date as string, by default January 1st of the
+                          current year
+        :param date_to: last date as string, by default December 31st of the
+                        current year
+        :return: string
+        """
+        # The feed is served to anonymous users, so the rendered body is not
+        # cached by request parameters: the holidays are read from the cache
+        # per region and year, and unchanged feeds are answered by their ETag
+        start_dt, end_dt = self._get_holidays_feed_range(date_from, date_to)
+        country = self.env["res.country"]
+        state = self.env["res.country.state"]
+        if country_code:
+            country = country.search([("code", "=", country_code.upper())], limit=1)
+            if not country:
+                raise UserError(_("Unknown country code %s.") % country_code)
+        if state_code:
+            state = state.search(
+                [("country_id", "=", country.id), ("code", "=", state_code.upper()),],
+                limit=1,
+            )
+            if not state:
+                raise UserError(_("Unknown state code %s.") % state_code)
+        lines = self._get_region_holidays_list(
+            country.id or False, state.id or False, start_dt, end_dt
+        )
+        holidays = [
+            {
+                "id": line.id,
+                "date": line.date,
+                "name": line.name,
+                "country": line.year_id.country_id.code or None,
+                "states": line.state_ids.mapped("code"),
+                "write_date": line.write_date,
+            }
+            for line in lines
+        ]
+        if feed_format == "ics":
+            return self._render_holidays_feed_ics(holidays)
+        return self._render_holidays_feed_json(holidays)
+
+    @api.model
+    def _get_holidays_feed_range(self, date_from=None, date_to=None):
+        """
+        Returns the checked dates of a public holidays feed
+        :param date_from: first date as string, by default January 1st of the
+                          current year
+        :param date_to: last date as string, by default December 31st of the
+                        current year
+        :return: (start date, end date) tuple
+        """
+        today = fields.Date.context_today(self)
+        try:
+            start_dt = fields.Date.to_date(date_from) or today.replace(month=1, day=1)
+            end_dt = fields.Date.to_date(date_to) or today.replace(month=12, day=31)
+        except ValueError:
+            raise UserError(_("Invalid date, expected format is YYYY-MM-DD."))
+        if start_dt > end_dt:
+            raise UserError(_("The start date must be before the end date."))
+        if end_dt.year - start_dt.year >= FEED_MAX_YEARS:
+            raise UserError(
+                _("The public holidays feed is limited to %s years.") % FEED_MAX_YEARS
+            )
+        return start_dt, end_dt
+
+    @api.model
+    def _render_holidays_feed_json(self, holidays):
+        return json.dumps(
+            [
+                {
+                    "date": fields.Date.to_string(holiday["date"]),
+                    "name": holiday["name"],
+                    "country": holiday["country"],
+                    "states": holiday["states"],
+                }
+                for holiday in holidays
+            ]
+        )
+
+    @api.model
+    def _render_holidays_feed_ics(self, holidays):
+        def escape(value):
+            return (
+                value.replace("\\", "\\\\")
+                .replace(";", "\\;")
+                .replace(",", "\\,")
+                .replace("\n", "\\n")
+            )
+
+        lines = [
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            "PRODID:-//OCA//hr_holidays_public//EN",
+            "CALSCALE:GREGORIAN",
+        ]
+        for holiday in holidays:
+            lines += [
+                "BEGIN:VEVENT",
+                "UID:hr-holidays-public-line-%s@%s"
+                % (holiday["id"], self.env.cr.dbname),
+                "DTSTAMP:%s" % holiday["write_date"].strftime("%Y%m%dT%H%M%SZ"),
+                "DTSTART;VALUE=DATE:%s" % holiday["date"].strftime("%Y%m%d"),
+                "DTEND;VALUE=DATE:%s"
+                % (holiday["date"] + datetime.timedelta(days=1)).strftime("%Y%m%d"),
+                "SUMMARY:%s" % escape(holiday["name"]),
+            ]
+            if holiday["states"]:
+                lines.append("LOCATION:%s" % escape(",".join(holiday["states"])))
+            lines.append("END:VEVENT")
+        lines.append("END:VCALENDAR")
+        return "\r\n".join(lines) + "\r\n"
+
+    @api.model
+    def _holidays_changed(self, regions):
+        """Refresh the stored bitmaps of the given years and countries, and
+        clear the cached holidays of all the workers.
+        :param regions: set of (year, country ID) tuples, a False country
+                        standing for the holidays without country
+        """
+        self.env["hr.holidays.public.bitmap"]._refresh_regions(regions)
+        self.clear_caches()
+
+    @api.model
+    def _get_holidays_regions(self, employee_ids):
+        """
+        Returns the regions used for looking up the public holidays of employees
+        :param employee_ids: list of IDs of employees. A False value stands for
+                             no employee, for which holidays of all countries
+                             apply (see `_get_holidays_region`).
+        :return: dict {employee_id: (country_id, state_id)}
+        """
+        employees = (
+            self.env["hr.employee"]
+            .sudo()
+            .browse([employee_id for employee_id in employee_ids if employee_id])
+        )
+        regions = {
+            employee["id"]: (
+                employee["holidays_country_id"] or False,
+                employee["holidays_state_id"] or False,
+            )
+            for employee in employees.read(
+                ["holidays_country_id", "holidays_state_id"], load=False
+            )
+        }
+        if not all(employee_ids):
+            regions[False] = (None, False)
+        return regions
+
+    @api.model
+    def _get_holidays_region(self, employee_id=None):
+        """
+        Returns the region used for looking up the public holidays of an employee
+        :param employee_id: ID of the employee
+        :return: tuple (country_id, state_id). country_id is None when no
+                 employee is given, meaning holidays of all countries apply.
+        """
+        employee_id = employee_id or False
+        return self._get_holidays_regions([employee_id])[employee_id]
+
+    @api.model
+    @tools.ormcache()
+    def _get_holidays_years(self):
+        """
+        Returns the years having public holidays defined, so that other years
+        are neither queried nor cached
+        :return: frozenset of years as integer
+        """
+        return frozenset(self.sudo().search([]).mapped("year"))
+
+    @api.model
+    @tools.ormcache("country_id", "state_id", "year")
+    def _get_holidays_index(self, country_id, state_id, year):
+        """
+        Returns the public holidays of a year for a region. The result is kept
+        in the registry cache, which is cleared on every change of public
+        holidays or public holiday lines.
+        :param country_id: ID of the country, False for holidays without
+                           country, None for holidays of any country
+        :param state_id: ID of the country state or False
+        :param year: year as integer
+        :return: tuple of (date, hr.holidays.public.line ID) sorted by date
+        """
+        holidays_filter = [("year", "=", year)]
+        if country_id:
+            holidays_filter += [
+                "|",
+                ("country_id", "=", False),
+                ("country_id", "=", country_id),
+            ]
+        elif country_id is not None:
+            holidays_filter.append(("country_id", "=", False))
+        pholidays = self.sudo().search(holidays_filter)
+        if not pholidays:
+            return ()
+        states_filter = [("year_id", "in", pholidays.ids)]
+        if state_id:
+            states_filter += [
+                "|",
+                ("national", "=", True),
+                ("state_ids", "=", state_id),
+            ]
+        else:
+            states_filter.append(("national", "=", True))
+        lines = (
+            self.env["hr.holidays.public.line"]
+            .sudo()
+            .search_read(states_filter, ["date"])
+        )
+        return tuple((line["date"], line["id"]) for line in lines)
+
+    @api.model
+    @tools.ormcache("country_id", "state_id", "year")
+    def _get_holidays_dates(self, country_id, state_id, year):
+        """
+        Returns the public holiday dates of a year for a region, read from the
+        stored bitmaps unless holidays of all countries are requested
+        :return: frozenset of dates
+        """
+        if country_id is None:
+            return frozenset(
+                line_date
+                for line_date, _line_id in self._get_holidays_index(
+                    country_id, state_id, year
+                )
+            )
+        bitmap = self.env["hr.holidays.public.bitmap"]._get_bitmap(
+            country_id, state_id, year
+        )
+        if not bitmap:
+            return frozenset()
+        first_day = datetime.date(year, 1, 1)
+        return frozenset(
+            first_day + datetime.timedelta(days=day)
+            for day, bit in enumerate(bitmap)
+            if bit == "1"
+        )
+
     @api.model
     @api.returns("hr.holidays.public.line")
     def get_holidays_list(
@@ -71,37 +426,100 @@ class HrHolidaysPublic(models.Model):
         if not start_dt and not end_dt:
             start_dt = datetime.date(year, 1, 1)
             end_dt = datetime.date(year, 12, 31)
-        years = list(range(start_dt.year, end_dt.year + 1))
-        holidays_filter = [("year", "in", years)]
-        employee = False
-        if employee_id:
-            employee = self.env["hr.employee"].browse(employee_id)
-            if employee.address_id and employee.address_id.country_id:
-                holidays_filter.append("|")
-                holidays_filter.append(("country_id", "=", False))
-                holidays_filter.append(
-                    ("country_id", "=", employee.address_id.country_id.id)
-                )
-            else:
-                holidays_filter.append(("country_id", "=", False))
-        pholidays = self.search(holidays_filter)
-        if not pholidays:
-            return self.env["hr.holidays.public.line"]
+        country_id, state_id = self._get_holidays_region(employee_id)
+        return self._get_region_holidays_list(country_id, state_id, start_dt, end_dt)
 
-        states_filter = [("year_id", "in", pholidays.ids)]
-        if employee and employee.address_id and employee.address_id.state_id:
-            states_filter += [
-                "|",
-                ("state_ids", "=", False),
-                ("state_ids", "=", employee.address_id.state_id.id),
+    @api.model
+    @api.returns("hr.holidays.public.line")
+    def _get_region_holidays_list(self, country_id, state_id, start_dt, end_dt):
+        """
+        Returns recordset of hr.holidays.public.line
+        for the specified region and dates
+        :param country_id: ID of the country, False for holidays without
+                           country, None for holidays of any country
+        :param state_id: ID of the country state or False
+        :param start_dt: start_dt as date
+        :param end_dt: end_dt as date
+        :return: recordset of hr.holidays.public.line
+        """
+        start_dt = fields.Date.to_date(start_dt)
+        end_dt = fields.Date.to_date(end_dt)
+        line_ids = []
+        years = self._get_holidays_years()
+        for holiday_year in range(start_dt.year, end_dt.year + 1):
+            if holiday_year not in years:
+                continue
+            line_ids += [
+                line_id
+                for line_date, line_id in self._get_holidays_index(
+                    country_id, state_id, holiday_year
+                )
+                if start_dt <= line_date <= end_dt
             ]
-        else:
-            states_filter.append(("state_ids", "=", False))
-        states_filter.append(("date", ">=", start_dt))
-        states_filter.append(("date", "<=", end_dt))
-        hhplo = self.env["hr.holidays.public.line"]
-        holidays_lines = hhplo.search(states_filter)
-        return holidays_lines
+        return self.env["hr.holidays.public.line"].browse(line_ids)
+
+    @api.model
+    def _get_region_holidays_dates(self, country_id, state_id, start_dt, end_dt):
+        """
+        Returns the public holiday dates of a region between two dates
+        :param country_id: ID of the country, False for holidays without
+                           country, None for holidays of any country
+        :param state_id: ID of the country state or False
+        :param start_dt: start_dt as date
+        :param end_dt: end_dt as date
+        :return: set of dates
+        """
+        start_dt = fields.Date.to_date(start_dt)
+        end_dt = fields.Date.to_date(end_dt)
+        return {
+            holiday_date
+            for year in range(start_dt.year, end_dt.year + 1)
+            for holiday_date in self._get_holidays_dates(country_id, state_id, year)
+            if start_dt <= holiday_date <= end_dt
+        }
+
+    @api.model
+    def get_holidays_map(self, employee_ids, start_dt, end_dt):
+        """
+        Returns the public holiday dates of several employees at once. Employees
+        are grouped by region, so the holidays are only resolved once per region.
+        :param employee_ids: list of IDs of employees, False for no employee
+        :param start_dt: start_dt as date
+        :param end_dt: end_dt as date
+        :return: dict {employee_id: set of dates}
+        """
+        start_dt = fields.Date.to_date(start_dt)
+        end_dt = fields.Date.to_date(end_dt)
+        regions = self._get_holidays_regions(employee_ids)
+        dates_by_region = {
+            region: self._get_region_holidays_dates(*region, start_dt, end_dt)
+            for region in set(regions.values())
+        }
+        return {
+            employee_id: set(dates_by_region[region])
+            for employee_id, region in regions.items()
+        }
+
+    @api.model
+    def public_holidays_mask(self, dates, employee_id=None):
+        """
+        Returns whether each of the given dates is a public holiday for the
+        employee, resolving the holidays only once per year
+        :param dates: iterable of date objects
+        :param employee_id: ID of the employee
+        :return: list of bool aligned with dates
+        """
+        country_id, state_id = self._get_holidays_region(employee_id)
+        holidays_by_year = {}
+        mask = []
+        for selected_date in dates:
+            year = selected_date.year
+            if year not in holidays_by_year:
+                holidays_by_year[year] = self._get_holidays_dates(
+                    country_id, state_id, year
+                )
+            mask.append(selected_date in holidays_by_year[year])
+        return mask
 
     @api.model
     def is_public_holiday(self, selected_date, employee_id=None):
@@ -111,14 +529,7 @@ class HrHolidaysPublic(models.Model):
         :param employee_id: ID of the employee
         :return: bool
         """
-        holidays_lines = self.get_holidays_list(
-            year=selected_date.year, employee_id=employee_id
-        )
-        if holidays_lines:
-            hol_date = holidays_lines.filtered(lambda r: r.date == selected_date)
-            if hol_date.ids:
-                return True
-        return False
+        return self.public_holidays_mask([selected_date], employee_id=employee_id)[0]
 
 
 class HrHolidaysPublicLine(models.Model):
@@ -140,48 +551,97 @@ class HrHolidaysPublicLine(models.Model):
         "Related States",
     )
     meeting_id = fields.Many2one("calendar.event", string="Meeting", copy=False)
+    meeting_to_sync = fields.Boolean(
+        copy=False,
+        index=True,
+        help="Technical field set when the meeting has to be updated by the "
+        "scheduled action.",
+    )
+    rule_id = fields.Many2one(
+        "hr.holidays.public.rule", string="Rule", ondelete="set null", copy=False
+    )
+    national = fields.Boolean(
+        compute="_compute_national",
+        store=True,
+        index=True,
+        help="Technical field set when the holiday applies to all the states.",
+    )
+
+    def init(self):
+        tools.create_index(
+            self._cr,
+            "hr_holidays_public_line_year_id_date_index",
+            self._table,
+            ["year_id", "date"],
+        )
+        tools.create_index(
+            self._cr,
+            "hr_holiday_public_state_rel_state_id_line_id_index",
+            "hr_holiday_public_state_rel",
+            ["state_id", "line_id"],
+        )
+
+    @api.depends("state_ids")
+    def _compute_national(self):
+        for line in self:
+            line.national = not line.state_ids
 
     @api.constrains("date", "state_ids")
     def _check_date_state(self):
         for line in self:
-            line._check_date_state_one()
-
-    def _check_date_state_one(self):
-        if self.date.year != self.year_id.year:
+            if line.date.year != line.year_id.year:
+                raise ValidationError(
+                    _(
+                        "Dates of holidays should be the same year as the calendar"
+                        " year they are being assigned to"
+                    )
+                )
+        self.flush(["date", "year_id", "state_ids", "national"])
+        # Lines sharing a date and one of their states
+        self.env.cr.execute(
+            """
+            SELECT line.date
+            FROM hr_holidays_public_line line
+            JOIN hr_holiday_public_state_rel rel ON rel.line_id = line.id
+            JOIN hr_holiday_public_state_rel other_rel
+                ON other_rel.state_id = rel.state_id
+                AND other_rel.line_id != line.id
+            JOIN hr_holidays_public_line other
+                ON other.id = other_rel.line_id
+                AND other.year_id = line.year_id
+                AND other.date = line.date
+            WHERE line.id IN %s
+            LIMIT 1
+            """,
+            (tuple(self.ids),),
+        )
+        row = self.env.cr.fetchone()
+        if row:
             raise ValidationError(
                 _(
-                    "Dates of holidays should be the same year as the calendar"
-                    " year they are being assigned to"
+                    "You can't create duplicate public holiday per date"
+                    " %s and one of the country states."
                 )
+                % row[0]
             )
-
-        if self.state_ids:
-            domain = [
-                ("date", "=", self.date),
-                ("year_id", "=", self.year_id.id),
-                ("state_ids", "!=", False),
-                ("id", "!=", self.id),
-            ]
-            holidays = self.search(domain)
-
-            for holiday in holidays:
-
-                if self.state_ids & holiday.state_ids:
-                    raise ValidationError(
-                        _(
-                            "You can't create duplicate public holiday per date"
-                            " %s and one of the country states."
-                        )
-                        % self.date
-                    )
-        domain = [
-            ("date", "=", self.date),
-            ("year_id", "=", self.year_id.id),
-            ("state_ids", "=", False),
-        ]
-        if self.search_count(domain) > 1:
+        # Lines sharing a date without states
+        self.env.cr.execute(
+            """
+            SELECT line.date
+            FROM hr_holidays_public_line line
+            JOIN hr_holidays_public_line other
+                ON other.year_id = line.year_id
+                AND other.date = line.date
+                AND other.id != line.id
+            WHERE line.id IN %s AND line.national AND other.national
+            LIMIT 1
+            """,
+            (tuple(self.ids),),
+        )
+        row = self.env.cr.fetchone()
+        if row:
             raise ValidationError(
-                _("You can't create duplicate public holiday per date %s.") % self.date
+                _("You can't create duplicate public holiday per date %s.") % row[0]
             )
         return True
 
@@ -208,20 +668,245 @@ class HrHolidaysPublicLine(models.Model):
             meeting_values.update({"categ_ids": [(6, 0, categ_id.ids)]})
         return meeting_values
 
-    @api.constrains("date", "name", "year_id", "state_ids")
+    def _prepare_holidays_aggregated_meeting_values(self):
+        """Values of the single meeting shared by lines of the same date and
+        country, when calendar events are aggregated."""
+        meeting_values = self[0]._prepare_holidays_meeting_values()
+        country = self[0].year_id.country_id
+        names = ", ".join(sorted(set(self.mapped("name"))))
+        meeting_values.update(
+            {
+                "name": "{} ({})".format(names, country.name) if country else names,
+                "description": "\n".join(
+                    "{}: {}".format(line.name, ", ".join(line.state_ids.mapped("name")))
+                    if line.state_ids
+                    else line.name
+                    for line in self
+                ),
+            }
+        )
+        return meeting_values
+
+    @api.model
+    def _is_aggregated_meetings_mode(self):
+        mode = (
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("hr_holidays_public.calendar_event_mode")
+        )
+        return mode == "aggregated"
+
+    def _get_holidays_meeting_keys(self):
+        return {(line.date, line.year_id.country_id.id) for line in self}
+
+    @api.model
+    def _sync_holidays_aggregated_meetings(self, keys, meetings=None):
+        """Make all the lines of each (date, country) key share a single meeting,
+        creating the missing meetings in a single batch and removing the ones
+        not used anymore.
+        :param keys: set of (date, country ID)
+        :param meetings: calendar.event records possibly not used anymore
+        """
+        meetings = meetings or self.env["calendar.event"]
+        lines = self.search([("date", "in", list({key[0] for key in keys}))])
+        groups = defaultdict(lambda: self.browse())
+        for line in lines:
+            key = (line.date, line.year_id.country_id.id)
+            if key in keys:
+                groups[key] |= line
+        meetings |= lines.mapped("meeting_id")
+        to_create = []
+        claimed_ids = set()
+        for group in groups.values():
+            # Keep the meeting already shared by most of the lines, unless
+            # another group kept it, e.g. when some of its lines moved
+            counts = Counter(line.meeting_id.id for line in group if line.meeting_id)
+            meeting_ids = [
+                meeting_id
+                for meeting_id, _count in counts.most_common()
+                if meeting_id not in claimed_ids
+            ]
+            if not meeting_ids:
+                to_create.append(group)
+                continue
+            claimed_ids.add(meeting_ids[0])
+            meeting = meetings.browse(meeting_ids[0])
+            values = group._prepare_holidays_aggregated_meeting_values()
+            changes = group[0]._get_holidays_meeting_changes(values, meeting)
+            if changes:
+                meeting.write(changes)
+            group.filtered(lambda line: line.meeting_id != meeting).write(
+                {"meeting_id": meeting.id}
+            )
+        new_meetings = self.env["calendar.event"].create(
+            [group._prepare_holidays_aggregated_meeting_values() for group in to_create]
+        )
+        for group, meeting in zip(to_create, new_meetings):
+            group.write({"meeting_id": meeting.id})
+        used_meetings = self.search([("meeting_id", "in", meetings.ids)]).mapped(
+            "meeting_id"
+        )
+        (meetings - used_meetings).unlink()
+
+    def _rebuild_holidays_meetings(self):
+        """Rebuild the calendar events of the lines according to the current
+        mode, collapsing the events of each date and country into a single one
+        in aggregated mode, or giving back its own event to each line."""
+        meetings = self.mapped("meeting_id")
+        if self._is_aggregated_meetings_mode():
+            self._sync_holidays_aggregated_meetings(
+                self._get_holidays_meeting_keys(), meetings
+            )
+            return
+        lines = self.search([("meeting_id", "in", meetings.ids)])
+        counts = Counter(line.meeting_id.id for line in lines)
+        to_create = lines.filtered(
+            lambda line: counts[line.meeting_id.id] > 1
+        ) | self.filtered(lambda line: not line.meeting_id)
+        to_create._create_holidays_meetings()
+        used_meetings = self.search([("meeting_id", "in", meetings.ids)]).mapped(
+            "meeting_id"
+        )
+        (meetings - used_meetings).unlink()
+
+    def _get_holidays_meeting_changes(self, values=None, meeting=None):
+        """Returns the meeting values differing from the current ones."""
+        self.ensure_one()
+        meeting = meeting or self.meeting_id
+        if values is None:
+            values = self._prepare_holidays_meeting_values()
+        changes = {}
+        for fname, value in values.items():
+            field = meeting._fields[fname]
+            new_value = field.convert_to_record(
+                field.convert_to_cache(value, meeting), meeting
+            )
+            if new_value != meeting[fname]:
+                changes[fname] = value
+        return changes
+
+    def _sync_calendar_event(self):
+        if self._is_aggregated_meetings_mode():
+            self._sync_holidays_aggregated_meetings(
+                self._get_holidays_meeting_keys(), self.mapped("meeting_id")
+            )
+            return
+        for rec in self.filtered("meeting_id"):
+            changes = rec._get_holidays_meeting_changes()
+            if changes:
+                rec.meeting_id.write(changes)
+
+    @api.model
+    def _is_calendar_sync_deferred(self):
+        defer = (
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("hr_holidays_public.defer_calendar_sync")
+        )
+        return tools.str2bool(defer or "False")
+
     def _update_calendar_event(self):
-        for rec in self:
-            if rec.meeting_id:
-                rec.meeting_id.write(rec._prepare_holidays_meeting_values())
+        """Update the meetings of the lines written, or flag them for the
+        scheduled action when the synchronization is deferred."""
+        if not self._is_calendar_sync_deferred():
+            self._sync_calendar_event()
+            return
+        lines = self.filtered("meeting_id")
+        if self._is_aggregated_meetings_mode():
+            # The lines sharing their meetings are regrouped as well
+            lines = self | self.search(
+                [("meeting_id", "in", lines.mapped("meeting_id").ids)]
+            )
+        lines.filtered(lambda line: not line.meeting_to_sync).write(
+            {"meeting_to_sync": True}
+        )
 
     @api.model
-    def create(self, values):
-        res = super().create(values)
-        res.meeting_id = self.env["calendar.event"].create(
-            res._prepare_holidays_meeting_values()
+    def _cron_sync_calendar_events(self, limit=500, autocommit=True):
+        """Synchronize the flagged meetings by batches until none is left,
+        committing after each batch so that the work done is kept if the
+        scheduled action is interrupted.
+        """
+        while True:
+            lines = self.search([("meeting_to_sync", "=", True)], limit=limit)
+            if not lines:
+                break
+            lines._sync_calendar_event()
+            lines.write({"meeting_to_sync": False})
+            if autocommit:
+                self.env.cr.commit()  # pylint: disable=invalid-commit
+
+    def _create_holidays_meetings(self):
+        """Create the calendar events of the lines in a single batch, and link
+        them back to the lines with a single query."""
+        if not self:
+            return
+        if self._is_aggregated_meetings_mode():
+            self._sync_holidays_aggregated_meetings(self._get_holidays_meeting_keys())
+            return
+        meetings = self.env["calendar.event"].create(
+            [line._prepare_holidays_meeting_values() for line in self]
+        )
+        self.env.cr.execute(
+            """
+            UPDATE hr_holidays_public_line AS line
+            SET meeting_id = data.meeting_id
+            FROM (VALUES %s) AS data(line_id, meeting_id)
+            WHERE line.id = data.line_id
+            """
+            % ", ".join(["%s"] * len(self)),
+            list(zip(self.ids, meetings.ids)),
+        )
+        self.invalidate_cache(["meeting_id"], self.ids)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        res = super().create(vals_list)
+        res._create_holidays_meetings()
+        self.env["hr.holidays.public.change"]._record_lines(res)
+        self.env["hr.holidays.public"]._holidays_changed(
+            res.mapped("year_id")._get_holidays_bitmap_regions()
         )
         return res
 
+    def write(self, vals):
+        if not {"name", "date", "year_id", "state_ids"} & set(vals):
+            return super().write(vals)
+        regions = set()
+        moved = bool({"date", "year_id", "state_ids"} & set(vals))
+        if moved:
+            regions = self.mapped("year_id")._get_holidays_bitmap_regions()
+            self.env["hr.holidays.public.change"]._record_lines(self)
+        aggregated = (
+            self._is_aggregated_meetings_mode()
+            and not self._is_calendar_sync_deferred()
+        )
+        if aggregated:
+            keys = self._get_holidays_meeting_keys()
+            meetings = self.mapped("meeting_id")
+        res = super().write(vals)
+        if aggregated:
+            self._sync_holidays_aggregated_meetings(
+                keys | self._get_holidays_meeting_keys(), meetings
+            )
+        else:
+            self._update_calendar_event()
+        if moved:
+            regions |= self.mapped("year_id")._get_holidays_bitmap_regions()
+            self.env["hr.holidays.public.change"]._record_lines(self)
+        self.env["hr.holidays.public"]._holidays_changed(regions)
+        return res
+
     def unlink(self):
-        self.mapped("meeting_id").unlink()
-        return super().unlink()
+        regions = self.mapped("year_id")._get_holidays_bitmap_regions()
+        meetings = self.mapped("meeting_id")
+        self.env["hr.holidays.public.change"]._record_lines(self)
+        if self._is_aggregated_meetings_mode():
+            keys = self._get_holidays_meeting_keys()
+            res = super().unlink()
+            self._sync_holidays_aggregated_meetings(keys, meetings)
+        else:
+            meetings.unlink()
+            res = super().unlink()
+        self.env["hr.holidays.public"]._holidays_changed(regions)
+        return res
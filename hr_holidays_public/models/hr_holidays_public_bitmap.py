@@ -0,0 +1,161 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from collections import defaultdict
+
+from odoo import api, fields, models
+from odoo.osv import expression
+
+
+class HrHolidaysPublicBitmap(models.Model):
+    """Precomputed public holidays of a region for a whole year.
+
+    The bitmap holds one character per day of the year, "1" meaning that
+    the day is a public holiday, so the N-th day of the year can be tested
+    with ``substr(bitmap, N, 1) = '1'`` in SQL. Rows are only stored for
+    the regions that have public holidays defined. Lookups fall back from
+    (country, state) to (country, no state), then to the global holidays
+    with and without state.
+    """
+
+    _name = "hr.holidays.public.bitmap"
+    _description = "Public Holidays Bitmap"
+    _order = "year, country_id, state_id"
+
+    year = fields.Integer("Calendar Year", required=True, index=True)
+    country_id = fields.Many2one("res.country", "Country", index=True)
+    state_id = fields.Many2one("res.country.state", "State", index=True)
+    bitmap = fields.Char(size=366, required=True)
+
+    _sql_constraints = [
+        (
+            "region_year_uniq",
+            "unique(year, country_id, state_id)",
+            "Only one bitmap per year and region is allowed.",
+        )
+    ]
+
+    def init(self):
+        # The unique constraint doesn't apply to rows without country or state
+        self.env.cr.execute(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS
+                hr_holidays_public_bitmap_region_year_uniq_index
+            ON hr_holidays_public_bitmap
+                (year, COALESCE(country_id, 0), COALESCE(state_id, 0))
+            """
+        )
+
+    @api.model
+    def _refresh_years(self, years):
+        """Rebuild the bitmaps of all the regions of the given years from the
+        public holiday lines.
+        :param years: iterable of years as integer
+        """
+        self._refresh_regions({(year, False) for year in years})
+
+    @api.model
+    def _refresh_regions(self, regions):
+        """Rebuild the bitmaps of the given countries and years from the public
+        holiday lines. The holidays without country being part of the bitmaps of
+        every country, all the countries of a year are rebuilt for them.
+        :param regions: iterable of (year, country ID) tuples, a False country
+                        standing for the holidays without country
+        """
+        country_ids_by_year = defaultdict(set)
+        for year, country_id in regions:
+            if year:
+                country_ids_by_year[year].add(country_id or False)
+        if not country_ids_by_year:
+            return
+        self = self.sudo()
+        bitmap_domains = []
+        line_domains = []
+        full_years = set()
+        for year, country_ids in country_ids_by_year.items():
+            if False in country_ids:
+                full_years.add(year)
+                bitmap_domains.append([("year", "=", year)])
+                line_domains.append([("year_id.year", "=", year)])
+                continue
+            bitmap_domains.append(
+                [("year", "=", year), ("country_id", "in", list(country_ids))]
+            )
+            line_domains.append(
+                [
+                    ("year_id.year", "=", year),
+                    ("year_id.country_id", "in", list(country_ids | {False})),
+                ]
+            )
+        self.search(expression.OR(bitmap_domains)).unlink()
+        lines = self.env["hr.holidays.public.line"].search(expression.OR(line_domains))
+        lines_by_year = defaultdict(list)
+        for line in lines:
+            lines_by_year[line.year_id.year].append(
+                (
+                    line.year_id.country_id.id or False,
+                    set(line.state_ids.ids),
+                    line.date.timetuple().tm_yday,
+                )
+            )
+        vals_list = []
+        for year, year_lines in lines_by_year.items():
+            country_ids = {line[0] for line in year_lines if line[0]}
+            if year in full_years:
+                country_ids.add(False)
+            for country_id in country_ids:
+                region_lines = [
+                    line for line in year_lines if line[0] in (False, country_id)
+                ]
+                state_ids = set().union(*[line[1] for line in region_lines])
+                for state_id in state_ids | {False}:
+                    days = {
+                        day
+                        for _country_id, line_state_ids, day in region_lines
+                        if not line_state_ids or state_id in line_state_ids
+                    }
+                    vals_list.append(
+                        {
+                            "year": year,
+                            "country_id": country_id,
+                            "state_id": state_id,
+                            "bitmap": "".join(
+                                "1" if day in days else "0" for day in range(1, 367)
+                            ),
+                        }
+                    )
+        self.create(vals_list)
+
+    @api.model
+    def _get_bitmap(self, country_id, state_id, year):
+        """
+        Returns the bitmap of public holidays of a year for a region
+        :param country_id: ID of the country or False
+        :param state_id: ID of the country state or False
+        :param year: year as integer
+        :return: string of 366 "0"/"1" characters, or False if the region
+                 has no public holidays defined for the year
+        """
+        rows = self.sudo().search_read(
+            [
+                ("year", "=", year),
+                ("country_id", "in", list({False, country_id})),
+                ("state_id", "in", list({False, state_id})),
+            ],
+            ["country_id", "state_id", "bitmap"],
+        )
+        bitmaps = {
+            (
+                row["country_id"] and row["country_id"][0],
+                row["state_id"] and row["state_id"][0],
+            ): row["bitmap"]
+            for row in rows
+        }
+        for region in [
+            (country_id, state_id),
+            (country_id, False),
+            (False, state_id),
+            (False, False),
+        ]:
+            if region in bitmaps:
+                return bitmaps[region]
+        return False
@@ -0,0 +1,80 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from collections import defaultdict
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+# Dates of a region closer than this are queued as a single range
+RANGE_MAX_GAP_DAYS = 31
+
+
+def merge_date_ranges(ranges, max_gap_days=0):
+    """Merge date ranges overlapping or separated by at most max_gap_days.
+    :param ranges: iterable of (date_from, date_to)
+    :return: sorted list of (date_from, date_to)
+    """
+    merged = []
+    for date_from, date_to in sorted(ranges):
+        if merged and date_from - merged[-1][1] <= timedelta(days=max_gap_days):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], date_to))
+        else:
+            merged.append((date_from, date_to))
+    return merged
+
+
+class HrHolidaysPublicChange(models.Model):
+    """Range of public holiday dates of a region added, moved or removed since
+    the durations of the leaves were last recomputed.
+    """
+
+    _name = "hr.holidays.public.change"
+    _description = "Public Holidays Changes"
+    _order = "date_from, id"
+
+    date_from = fields.Date(required=True)
+    date_to = fields.Date(required=True)
+    country_id = fields.Many2one("res.country", "Country")
+    state_ids = fields.Many2many(
+        "res.country.state",
+        "hr_holidays_public_change_state_rel",
+        "change_id",
+        "state_id",
+        "Related States",
+    )
+
+    @api.model
+    def _record_lines(self, lines):
+        """Queue the dates of the given public holiday lines, merged into
+        ranges for each region, so that bulk changes queue few records."""
+        dates_by_region = defaultdict(list)
+        for line in lines:
+            region = (line.year_id.country_id.id, tuple(sorted(line.state_ids.ids)))
+            dates_by_region[region].append(line.date)
+        vals_list = []
+        for (country_id, state_ids), dates in dates_by_region.items():
+            for date_from, date_to in merge_date_ranges(
+                [(line_date, line_date) for line_date in dates], RANGE_MAX_GAP_DAYS
+            ):
+                vals_list.append(
+                    {
+                        "date_from": date_from,
+                        "date_to": date_to,
+                        "country_id": country_id,
+                        "state_ids": [(6, 0, list(state_ids))],
+                    }
+                )
+        return self.sudo().create(vals_list)
+
+    def _get_changes(self):
+        """:return: set of (date_from, date_to, country_id, state_ids) tuples,
+        state_ids being a frozenset"""
+        return {
+            (
+                change.date_from,
+                change.date_to,
+                change.country_id.id,
+                frozenset(change.state_ids.ids),
+            )
+            for change in self
+        }
@@ -0,0 +1,188 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from collections import defaultdict
+from datetime import date, timedelta
+
+from dateutil.easter import easter
+from dateutil.relativedelta import relativedelta, weekday
+
+from odoo import _, api, fields, models
+from odoo.exceptions import ValidationError
+
+
+class HrHolidaysPublicRule(models.Model):
+    _name = "hr.holidays.public.rule"
+    _description = "Public Holidays Rules"
+    _order = "holiday_id, id"
+
+    holiday_id = fields.Many2one(
+        "hr.holidays.public", "Public Holidays", required=True, ondelete="cascade"
+    )
+    name = fields.Char("Name", required=True)
+    rule_type = fields.Selection(
+        [
+            ("fixed", "Fixed date"),
+            ("easter", "Relative to Easter"),
+            ("weekday", "Weekday of the month"),
+        ],
+        string="Type",
+        required=True,
+        default="fixed",
+    )
+    month = fields.Integer(default=1)
+    day = fields.Integer(default=1)
+    easter_offset = fields.Integer(
+        help="Number of days after Easter Sunday, negative for days before."
+    )
+    weekday = fields.Selection(
+        [
+            ("0", "Monday"),
+            ("1", "Tuesday"),
+            ("2", "Wednesday"),
+            ("3", "Thursday"),
+            ("4", "Friday"),
+            ("5", "Saturday"),
+            ("6", "Sunday"),
+        ],
+        string="Day of Week",
+        default="0",
+    )
+    week_number = fields.Integer(
+        "Occurrence",
+        default=1,
+        help="1 for the first occurrence of the weekday in the month, 2 for the "
+        "second one... -1 for the last one, -2 for the one before...",
+    )
+    weekend_substitution = fields.Selection(
+        [
+            ("none", "None"),
+            ("next_monday", "Next Monday"),
+            ("nearest_weekday", "Nearest weekday"),
+        ],
+        required=True,
+        default="none",
+        help="Move the public holiday when it falls on a weekend: either to the "
+        "next Monday, or to Friday for Saturday and to Monday for Sunday.",
+    )
+    state_ids = fields.Many2many(
+        "res.country.state",
+        "hr_holiday_public_rule_state_rel",
+        "rule_id",
+        "state_id",
+        "Related States",
+    )
+
+    @api.constrains("rule_type", "month", "day", "week_number")
+    def _check_rule(self):
+        for rule in self:
+            if rule.rule_type in ("fixed", "weekday") and not 1 <= rule.month <= 12:
+                raise ValidationError(_("The month must be between 1 and 12."))
+            if rule.rule_type == "fixed" and not 1 <= rule.day <= 31:
+                raise ValidationError(_("The day must be between 1 and 31."))
+            if rule.rule_type == "fixed":
+                try:
+                    # Leap year, so that the 29th of February is accepted
+                    date(2000, rule.month, rule.day)
+                except ValueError:
+                    raise ValidationError(
+                        _("The day %s does not exist in the month %s.")
+                        % (rule.day, rule.month)
+                    )
+            if rule.rule_type == "weekday" and not 1 <= abs(rule.week_number) <= 5:
+                raise ValidationError(
+                    _("The occurrence must be between 1 and 5, or -5 and -1.")
+                )
+
+    def _get_dates(self, years, taken_dates=()):
+        """
+        Returns the dates of the rules for several years at once. Easter is
+        only computed once per year for all the rules.
+        :param years: iterable of years as integer
+        :param taken_dates: dates of other public holidays, besides the lines of
+                            the public holidays of the rules not generated from
+                            rules, on which no holiday is moved
+        :return: dict {rule_id: {year: date}}. Years for which a rule gives no
+                 date (e.g. 29th of February) are left out.
+        """
+        years = sorted(set(years))
+        easter_dates = {}
+        if "easter" in self.mapped("rule_type"):
+            easter_dates = {year: easter(year) for year in years}
+        res = {}
+        for rule in self:
+            if rule.rule_type == "fixed":
+                dates = {}
+                for year in years:
+                    try:
+                        dates[year] = date(year, rule.month, rule.day)
+                    except ValueError:
+                        continue
+            elif rule.rule_type == "easter":
+                offset = timedelta(days=rule.easter_offset)
+                dates = {year: easter_dates[year] + offset for year in years}
+            else:
+                delta = relativedelta(
+                    day=1 if rule.week_number > 0 else 31,
+                    weekday=weekday(int(rule.weekday), rule.week_number),
+                )
+                dates = {
+                    year: date(year, rule.month, 1) + delta
+                    for year in years
+                    if (date(year, rule.month, 1) + delta).month == rule.month
+                }
+            res[rule.id] = dates
+        # Substitute the weekend dates once all the dates of the same public
+        # holidays are known, so that two of them never land on the same day
+        substituted = defaultdict(list)
+        # Holidays are neither moved onto the lines not generated from rules
+        other_dates = defaultdict(lambda: set(taken_dates))
+        for line in self.mapped("holiday_id.line_ids"):
+            if not line.rule_id:
+                other_dates[line.year_id].add(line.date)
+        taken_dates = defaultdict(set)
+        for rule in self:
+            for year, rule_date in res[rule.id].items():
+                key = (rule.holiday_id, year)
+                if rule.weekend_substitution != "none" and rule_date.weekday() >= 5:
+                    substituted[key].append((rule_date, rule))
+                else:
+                    taken_dates[key].add(rule_date)
+        for key, rule_dates in substituted.items():
+            for rule_date, rule in sorted(rule_dates, key=lambda x: x[0]):
+                new_date = rule._apply_weekend_substitution(
+                    rule_date, taken_dates[key] | other_dates[key[0]]
+                )
+                taken_dates[key].add(new_date)
+                res[rule.id][key[1]] = new_date
+        return res
+
+    def _apply_weekend_substitution(self, rule_date, taken_dates=()):
+        """
+        Returns the date of the public holiday once moved out of the weekend
+        :param rule_date: date given by the rule
+        :param taken_dates: dates of the other public holidays, the holiday is
+                            moved to the next free weekday when it collides
+                            with one of them
+        :return: date
+        """
+        self.ensure_one()
+        if self.weekend_substitution == "none" or rule_date.weekday() < 5:
+            return rule_date
+        if self.weekend_substitution == "next_monday":
+            new_date = rule_date + timedelta(days=7 - rule_date.weekday())
+        else:
+            new_date = rule_date + timedelta(days=-1 if rule_date.weekday() == 5 else 1)
+        while new_date in taken_dates or new_date.weekday() >= 5:
+            new_date += timedelta(days=1)
+        # Never move a public holiday to another calendar year
+        return new_date if new_date.year == rule_date.year else rule_date
+
+    def _prepare_line_values(self, rule_date):
+        self.ensure_one()
+        return {
+            "name": self.name,
+            "date": rule_date,
+            "variable_date": False,
+            "state_ids": [(6, 0, self.state_ids.ids)],
+            "rule_id": self.id,
+        }
@@ -2,37 +2,203 @@
 # Copyright 2018 Brainbean Apps
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
+import logging
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
 from odoo import api, models
+from odoo.osv import expression
+from odoo.tools import float_compare, split_every
+
+from .hr_holidays_public_change import merge_date_ranges
+
+_logger = logging.getLogger(__name__)
 
 
 class HrLeave(models.Model):
     _inherit = "hr.leave"
 
     def _get_number_of_days(self, date_from, date_to, employee_id):
-        if self.holiday_status_id.exclude_public_holidays or not self.holiday_status_id:
-            instance = self.with_context(
-                employee_id=employee_id, exclude_public_holidays=True
-            )
-        else:
-            instance = self
-        return super(HrLeave, instance)._get_number_of_days(
-            date_from, date_to, employee_id
-        )
+        if (
+            self.holiday_status_id
+            and not self.holiday_status_id.exclude_public_holidays
+        ):
+            return super()._get_number_of_days(date_from, date_to, employee_id)
+        resources = self.env["hr.employee"].browse(employee_id).resource_id or None
+        with self.env["resource.calendar"]._exclude_public_holidays(
+            employee_id, resources=resources
+        ):
+            return super()._get_number_of_days(date_from, date_to, employee_id)
+
+    def _get_natural_period_excluded_dates(self, start_date, end_date, employee_id):
+        """Exclude the public holidays from the natural days counted by
+        hr_holidays_natural_period, when the leave type excludes them.
+        """
+        parent = getattr(super(), "_get_natural_period_excluded_dates", None)
+        dates = set(parent(start_date, end_date, employee_id)) if parent else set()
+        if not self.holiday_status_id or self.holiday_status_id.exclude_public_holidays:
+            dates |= self.env["hr.holidays.public"].get_holidays_map(
+                [employee_id], start_date, end_date
+            )[employee_id]
+        return dates
 
     @api.depends("number_of_days")
     def _compute_number_of_hours_display(self):
         """If the leave is validated, no call to `_get_number_of_days` is done, so we
-        need to inject the context here for including the public holidays if applicable.
+        need to exclude the public holidays here if applicable.
 
-        For such cases, we need to serialize the call to super in fragments.
+        Such leaves are grouped by public holidays region, calling super once per
+        region whatever the number of leaves, in the same environment.
         """
-        to_serialize = self.filtered(
+        to_group = self.filtered(
             lambda x: x.state == "validate"
             and x.holiday_status_id.exclude_public_holidays
         )
-        for leave in to_serialize:
-            leave = leave.with_context(
-                exclude_public_holidays=True, employee_id=leave.employee_id.id
+        regions = self.env["hr.holidays.public"]._get_holidays_regions(
+            [leave.employee_id.id for leave in to_group]
+        )
+        leave_ids_by_region = defaultdict(list)
+        for leave in to_group:
+            leave_ids_by_region[regions[leave.employee_id.id]].append(leave.id)
+        calendar_model = self.env["resource.calendar"]
+        for region, leave_ids in leave_ids_by_region.items():
+            leaves = self.browse(leave_ids).with_prefetch(self._prefetch_ids)
+            with calendar_model._exclude_public_holidays(
+                region=region, resources=leaves.mapped("employee_id.resource_id")
+            ):
+                super(HrLeave, leaves)._compute_number_of_hours_display()
+        return super(HrLeave, self - to_group)._compute_number_of_hours_display()
+
+    @api.model
+    def _get_public_holidays_affected_leaves(self, changes):
+        """Search the leaves whose duration may be affected by public holidays
+        changes, in a single query on the leaves.
+
+        Changes are grouped by region, their dates being merged into ranges,
+        and the employees of each region are searched once. The leave dates
+        are stored in UTC, so one day of margin is taken on each side of the
+        changed dates.
+
+        :param changes: iterable of (date_from, date_to, country_id, state_ids)
+        tuples
+        :return: recordset of hr.leave
+        """
+        ranges_by_region = defaultdict(list)
+        for date_from, date_to, country_id, state_ids in changes:
+            region = (country_id or False, frozenset(state_ids or ()))
+            ranges_by_region[region].append((date_from, date_to))
+        employee_model = self.env["hr.employee"].sudo().with_context(active_test=False)
+        domains = []
+        for (country_id, state_ids), ranges in ranges_by_region.items():
+            range_domains = []
+            for date_from, date_to in merge_date_ranges(ranges, 1):
+                start = datetime.combine(date_from, time.min) - timedelta(days=1)
+                stop = datetime.combine(date_to, time.min) + timedelta(days=2)
+                range_domains.append(
+                    [("date_from", "<", stop), ("date_to", ">", start)]
+                )
+            domain = expression.OR(range_domains)
+            employee_domain = []
+            if country_id:
+                employee_domain.append(("holidays_country_id", "=", country_id))
+            if state_ids:
+                employee_domain.append(("holidays_state_id", "in", list(state_ids)))
+            if employee_domain:
+                employees = employee_model.search(employee_domain)
+                if not employees:
+                    continue
+                domain = expression.AND(
+                    [domain, [("employee_id", "in", employees.ids)]]
+                )
+            domains.append(domain)
+        if not domains:
+            return self.browse()
+        return self.sudo().search(
+            expression.AND(
+                [
+                    expression.OR(domains),
+                    [
+                        ("holiday_type", "=", "employee"),
+                        ("holiday_status_id.exclude_public_holidays", "=", True),
+                        ("state", "not in", ["cancel", "refuse"]),
+                    ],
+                ]
             )
-            super(HrLeave, leave)._compute_number_of_hours_display()
-        return super(HrLeave, self - to_serialize)._compute_number_of_hours_display()
+        )
+
+    def _recompute_public_holidays_days(
+        self, dry_run=False, batch_size=200, skip_exceeding=False
+    ):
+        """Recompute the duration of the leaves by batches, writing only the
+        ones that changed.
+
+        :param dry_run: if set, compute the differences without writing them
+        :param skip_exceeding: if set, leave untouched the leaves whose new
+        duration exceeds the remaining allocation of their employee, instead
+        of raising the allocation error
+        :return: list of (leave, old number of days, new number of days) for
+        the leaves whose duration changes
+        """
+        diff = []
+        calendar_model = self.env["resource.calendar"]
+        for leaves in split_every(batch_size, self.ids, self.browse):
+            for leave in leaves:
+                # The resource leaves of validated leaves must not be deducted
+                # from their own duration
+                with calendar_model._ignore_holiday_leaves(leave.ids):
+                    days = leave._get_number_of_days(
+                        leave.date_from, leave.date_to, leave.employee_id.id
+                    )
+                if float_compare(days, leave.number_of_days, precision_digits=2):
+                    diff.append((leave, leave.number_of_days, days))
+        if skip_exceeding:
+            exceeding = self._get_public_holidays_days_exceeding(diff)
+            if exceeding:
+                _logger.warning(
+                    "Durations of leaves %s not updated after a public holidays "
+                    "change, as they would exceed the allocations",
+                    sorted(exceeding),
+                )
+                diff = [item for item in diff if item[0].id not in exceeding]
+        if not dry_run:
+            leaves_by_days = defaultdict(list)
+            for leave, _old_days, days in diff:
+                leaves_by_days[days].append(leave.id)
+            for days, leave_ids in leaves_by_days.items():
+                self.browse(leave_ids).write({"number_of_days": days})
+        return diff
+
+    @api.model
+    def _get_public_holidays_days_exceeding(self, diff):
+        """Find the leaves whose longer duration would exceed the remaining
+        allocation of their employee, as checked by `_check_holidays`.
+
+        :param diff: list of (leave, old number of days, new number of days)
+        :return: set of IDs of hr.leave
+        """
+        increases = defaultdict(list)
+        for leave, old_days, days in diff:
+            leave_type = leave.holiday_status_id
+            if days > old_days and leave_type.allocation_type != "no":
+                increases[(leave.employee_id.id, leave_type)].append(
+                    (leave, days - old_days)
+                )
+        exceeding = set()
+        for (employee_id, leave_type), leaves_increase in increases.items():
+            days = leave_type.get_days(employee_id)[leave_type.id]
+            remaining = days["remaining_leaves"]
+            virtual_remaining = days["virtual_remaining_leaves"]
+            for leave, increase in leaves_increase:
+                validated = leave.state == "validate"
+                available = (
+                    min(remaining, virtual_remaining)
+                    if validated
+                    else virtual_remaining
+                )
+                if float_compare(increase, available, precision_digits=2) > 0:
+                    exceeding.add(leave.id)
+                    continue
+                virtual_remaining -= increase
+                if validated:
+                    remaining -= increase
+        return exceeding
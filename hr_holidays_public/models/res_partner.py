@@ -0,0 +1,18 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import models
+
+
+class ResPartner(models.Model):
+    _inherit = "res.partner"
+
+    def write(self, vals):
+        if not {"country_id", "state_id"} & set(vals):
+            return super().write(vals)
+        employees = (
+            self.env["hr.employee"].sudo().search([("address_id", "in", self.ids)])
+        )
+        regions = employees._get_holidays_region_values()
+        res = super().write(vals)
+        employees._holidays_region_changed(regions)
+        return res
@@ -3,43 +3,149 @@
 # Copyright 2021 Tecnativa - Víctor Martínez
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
+from collections import defaultdict
+from functools import partial
+
 from odoo import models
 
-from odoo.addons.resource.models.resource import Intervals
+EXCLUDE_PUBLIC_HOLIDAYS = "exclude_public_holidays"
+IGNORED_HOLIDAYS = "ignored_holidays"
+
+
+def _exclude_dates(items, dates):
+    if not any(item[0].date() in dates for item in items):
+        return items
+    return [item for item in items if item[0].date() not in dates]
 
 
 class ResourceCalendar(models.Model):
     _inherit = "resource.calendar"
 
-    def _attendance_intervals_batch_exclude_public_holidays(
-        self, start_dt, end_dt, intervals, resources, tz
+    def _exclude_public_holidays(self, employee_id=False, region=None, resources=None):
+        """Exclude the public holidays from the attendances computed within the
+        block, see ``_calendar_policy``.
+        :param employee_id: ID of the employee used for the resources without
+                            employee
+        :param region: (country_id, state_id) shared by all the resources, for
+                       skipping the lookup of their employees
+        :param resources: resource.resource records whose public holidays are
+                          excluded, all the resources if not set
+        """
+        return self._calendar_policy(
+            EXCLUDE_PUBLIC_HOLIDAYS, (employee_id, region), resources=resources
+        )
+
+    def _get_public_holidays_policy(self, resource_id=None):
+        """:return: (employee_id, region) if the public holidays are excluded
+        for the resource, None otherwise"""
+        policy = self._get_calendar_policy(EXCLUDE_PUBLIC_HOLIDAYS, resource_id)
+        if policy is not None:
+            return policy
+        if self.env.context.get("exclude_public_holidays"):
+            return (
+                self.env.context.get("employee_id", False),
+                self.env.context.get("public_holidays_region"),
+            )
+        return None
+
+    def _ignore_holiday_leaves(self, holiday_ids):
+        """Ignore the resource leaves of the given leave requests in the leave
+        intervals computed within the block, for computing the duration of
+        validated leave requests again.
+        :param holiday_ids: list of IDs of hr.leave
+        """
+        return self._calendar_policy(IGNORED_HOLIDAYS, list(holiday_ids))
+
+    def _leave_intervals_batch(
+        self, start_dt, end_dt, resources=None, domain=None, tz=None
+    ):
+        holiday_ids = self._get_calendar_policy(IGNORED_HOLIDAYS)
+        if holiday_ids:
+            if domain is None:
+                domain = [("time_type", "=", "leave")]
+            domain = domain + [("holiday_id", "not in", holiday_ids)]
+        return super()._leave_intervals_batch(
+            start_dt, end_dt, resources=resources, domain=domain, tz=tz
+        )
+
+    def _get_public_holidays_by_resource(
+        self, start_dt, end_dt, resources, employee_id=False, region=None
     ):
-        list_by_dates = (
-            self.env["hr.holidays.public"]
-            .get_holidays_list(
-                start_dt=start_dt.date(),
-                end_dt=end_dt.date(),
-                employee_id=self.env.context.get("employee_id", False),
+        """:return: dict {resource_id: set of public holiday dates}"""
+        holidays_public = self.env["hr.holidays.public"]
+        if region:
+            # All the resources share the given public holidays region
+            holiday_dates = holidays_public._get_region_holidays_dates(
+                *region, start_dt.date(), end_dt.date()
             )
-            .mapped("date")
+            return {resource.id: holiday_dates for resource in resources}
+        employees = (
+            self.env["hr.employee"]
+            .sudo()
+            .with_context(active_test=False)
+            .search([("resource_id", "in", resources.ids)])
         )
-        for resource in resources:
-            interval_resource = intervals[resource.id]
-            attendances = []
-            for attendance in interval_resource._items:
-                if attendance[0].date() not in list_by_dates:
-                    attendances.append(attendance)
-            intervals[resource.id] = Intervals(attendances)
-        return intervals
-
-    def _attendance_intervals_batch(
-        self, start_dt, end_dt, resources=None, domain=None, tz=None
+        employee_by_resource = {
+            employee.resource_id.id: employee.id for employee in employees
+        }
+        # Resources without employee fall back on the given employee
+        resource_employee_ids = [
+            employee_by_resource.get(resource.id, employee_id) for resource in resources
+        ]
+        holidays_map = holidays_public.get_holidays_map(
+            list(set(resource_employee_ids)), start_dt.date(), end_dt.date()
+        )
+        return {
+            resource.id: holidays_map[employee_id]
+            for resource, employee_id in zip(resources, resource_employee_ids)
+        }
+
+    def _get_public_holidays_transforms(
+        self, start_dt, end_dt, resources, employee_id=False, region=None
     ):
-        res = super()._attendance_intervals_batch(
-            start_dt=start_dt, end_dt=end_dt, resources=resources, domain=domain, tz=tz
+        """:return: dict {resource_id: function removing the intervals of its
+        public holidays}"""
+        holidays_by_resource = self._get_public_holidays_by_resource(
+            start_dt, end_dt, resources, employee_id=employee_id, region=region
         )
-        if self.env.context.get("exclude_public_holidays") and resources:
-            return self._attendance_intervals_batch_exclude_public_holidays(
-                start_dt, end_dt, res, resources, tz
+        return {
+            resource_id: partial(_exclude_dates, dates=holiday_dates)
+            for resource_id, holiday_dates in holidays_by_resource.items()
+            if holiday_dates
+        }
+
+    def _public_holidays_stage(self, start_dt, end_dt, resources, tz):
+        resources_by_policy = defaultdict(lambda: self.env["resource.resource"])
+        for resource in resources:
+            policy = self._get_public_holidays_policy(resource.id)
+            if policy is not None:
+                resources_by_policy[policy] |= resource
+        if not resources_by_policy:
+            return None
+        transforms = {}
+        for (employee_id, region), policy_resources in resources_by_policy.items():
+            transforms.update(
+                self._get_public_holidays_transforms(
+                    start_dt,
+                    end_dt,
+                    policy_resources,
+                    employee_id=employee_id,
+                    region=region,
+                )
             )
-        return res
+        return transforms
+
+    def _attendance_intervals_batch_exclude_public_holidays(
+        self, start_dt, end_dt, intervals, resources, tz, employee_id=False, region=None
+    ):
+        transforms = self._get_public_holidays_transforms(
+            start_dt, end_dt, resources, employee_id=employee_id, region=region
+        )
+        return self._apply_attendance_intervals_transforms(
+            intervals, resources, [transforms]
+        )
+
+    def _get_attendance_intervals_stages(self):
+        return super()._get_attendance_intervals_stages() + [
+            (20, "_public_holidays_stage")
+        ]
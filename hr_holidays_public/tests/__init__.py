@@ -2,3 +2,6 @@
 
 from . import test_holidays_calculation
 from . import test_holidays_public
+from . import test_holidays_public_rule
+from . import test_holidays_public_import_ics
+from . import test_holidays_public_feed
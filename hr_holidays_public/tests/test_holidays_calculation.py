@@ -3,6 +3,8 @@
 # Copyright 2018 Brainbean Apps
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
+from datetime import date, datetime
+
 from odoo.tests import common
 
 
@@ -189,3 +191,142 @@ class TestHolidaysComputeDays(TestHolidaysComputeDaysBase):
         leave_request.action_validate()
         self.assertEqual(leave_request.number_of_days, 2)
         self.assertEqual(leave_request.number_of_hours_display, 16)
+
+    def test_number_days_several_employees(self):
+        employees = (self.employee_1 | self.employee_2).with_context(
+            exclude_public_holidays=True
+        )
+        res = employees._get_work_days_data_batch(
+            datetime(1946, 12, 23, 0, 0, 0),  # Monday
+            datetime(1946, 12, 29, 23, 59, 59),  # Sunday
+        )
+        self.assertEqual(res[self.employee_1.id]["days"], 4)
+        self.assertEqual(res[self.employee_2.id]["days"], 2)
+
+    def test_recompute_leaves_after_public_holidays_change(self):
+        leave = self.HrLeave.create(
+            {
+                "date_from": "1946-12-16 00:00:00",  # Monday
+                "date_to": "1946-12-20 23:59:59",  # Friday
+                "holiday_status_id": self.holiday_type.id,
+                "employee_id": self.employee_1.id,
+            }
+        )
+        leave_other_country = self.HrLeave.create(
+            {
+                "date_from": "1946-12-16 00:00:00",  # Monday
+                "date_to": "1946-12-20 23:59:59",  # Friday
+                "holiday_status_id": self.holiday_type.id,
+                "employee_id": self.employee_2.id,
+            }
+        )
+        self.assertEqual(leave.number_of_days, 5)
+        leave.action_validate()
+        self.assertEqual(leave.state, "validate")
+        self.env["hr.holidays.public.change"].search([]).unlink()
+        self.public_holiday_global.line_ids = [
+            (0, 0, {"name": "Extra holiday", "date": "1946-12-18"})
+        ]
+        self.public_holiday_country.line_ids = [
+            (0, 0, {"name": "Other extra holiday", "date": "1946-12-19"})
+        ]
+        affected = self.HrLeave._get_public_holidays_affected_leaves(
+            self.env["hr.holidays.public.change"].search([])._get_changes()
+        )
+        self.assertEqual(affected, leave | leave_other_country)
+        wizard = self.env["public.holidays.recompute.leaves.wizard"].create({})
+        self.assertEqual(wizard.change_count, 2)
+        wizard.action_preview()
+        preview = {
+            line.leave_id: (line.old_number_of_days, line.new_number_of_days)
+            for line in wizard.preview_line_ids
+        }
+        self.assertEqual(preview, {leave: (5, 4), leave_other_country: (5, 3)})
+        self.assertEqual(leave.number_of_days, 5)
+        wizard.action_recompute()
+        self.assertEqual(leave.number_of_days, 4)
+        self.assertEqual(leave_other_country.number_of_days, 3)
+        self.assertFalse(self.env["hr.holidays.public.change"].search([]))
+
+    def test_recompute_leaves_after_region_change(self):
+        self.HrHolidaysPublic.create(
+            {
+                "year": 2100,
+                "country_id": self.address_2.country_id.id,
+                "line_ids": [(0, 0, {"name": "Future holiday", "date": "2100-12-22"})],
+            }
+        )
+        address = self.env["res.partner"].create(
+            {"name": "Address 3", "country_id": self.env.ref("base.uk").id}
+        )
+        employee = self.env["hr.employee"].create(
+            {
+                "name": "Employee 3",
+                "resource_calendar_id": self.calendar.id,
+                "address_id": self.address_1.id,
+            }
+        )
+        leave = self.HrLeave.create(
+            {
+                "date_from": "2100-12-20 00:00:00",  # Monday
+                "date_to": "2100-12-24 23:59:59",  # Friday
+                "holiday_status_id": self.holiday_type.id,
+                "employee_id": employee.id,
+            }
+        )
+        self.assertEqual(leave.number_of_days, 5)
+        leave.action_validate()
+        self.assertEqual(leave.state, "validate")
+        employee.address_id = self.address_2
+        self.assertEqual(leave.number_of_days, 4)
+        employee.address_id = address
+        self.assertEqual(leave.number_of_days, 5)
+        address.country_id = self.address_2.country_id
+        self.assertEqual(leave.number_of_days, 4)
+
+    def test_number_of_hours_several_validated_leaves(self):
+        self.holiday_type.request_unit = "hour"
+        leaves = self.HrLeave
+        for employee in (self.employee_1, self.employee_2):
+            leaves |= self.HrLeave.create(
+                {
+                    "date_from": "1946-12-23 00:00:00",  # Monday
+                    "date_to": "1946-12-29 23:59:59",  # Sunday
+                    "holiday_status_id": self.holiday_type.id,
+                    "employee_id": employee.id,
+                }
+            )
+        leaves.action_validate()
+        leaves.invalidate_cache(["number_of_hours_display"])
+        self.assertEqual(leaves.mapped("number_of_hours_display"), [32, 16])
+
+    def test_number_days_several_employees_without_context(self):
+        employees = self.employee_1 | self.employee_2
+        with self.env["resource.calendar"]._exclude_public_holidays():
+            res = employees._get_work_days_data_batch(
+                datetime(1946, 12, 23, 0, 0, 0),  # Monday
+                datetime(1946, 12, 29, 23, 59, 59),  # Sunday
+            )
+        self.assertEqual(res[self.employee_1.id]["days"], 4)
+        self.assertEqual(res[self.employee_2.id]["days"], 2)
+        res = employees._get_work_days_data_batch(
+            datetime(1946, 12, 23, 0, 0, 0),  # Monday
+            datetime(1946, 12, 29, 23, 59, 59),  # Sunday
+        )
+        self.assertEqual(res[self.employee_1.id]["days"], 5)
+
+    def test_public_holidays_changes_merged_by_region(self):
+        Change = self.env["hr.holidays.public.change"]
+        Change.search([]).unlink()
+        self.public_holiday_global.line_ids = [
+            (0, 0, {"name": "Extra holiday 1", "date": "1946-11-04"}),
+            (0, 0, {"name": "Extra holiday 2", "date": "1946-11-20"}),
+            (0, 0, {"name": "Extra holiday 3", "date": "1946-03-01"}),
+        ]
+        self.assertEqual(
+            Change.search([])._get_changes(),
+            {
+                (date(1946, 3, 1), date(1946, 3, 1), False, frozenset()),
+                (date(1946, 11, 4), date(1946, 11, 20), False, frozenset()),
+            },
+        )
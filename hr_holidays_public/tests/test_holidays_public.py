@@ -4,8 +4,11 @@
 
 from datetime import date
 
+from psycopg2 import IntegrityError
+
 from odoo.exceptions import UserError, ValidationError
 from odoo.tests.common import TransactionCase
+from odoo.tools import mute_logger
 
 
 class TestHolidaysPublic(TransactionCase):
@@ -93,6 +96,107 @@ class TestHolidaysPublic(TransactionCase):
                 }
             )
 
+    def test_duplicate_date_state_batch_fail(self):
+        # ensures that duplicates inside a single batch are detected
+        holiday4 = self.holiday_model.create(
+            {"year": 1994, "country_id": self.env.ref("base.us").id}
+        )
+        state_ids = [(6, 0, [self.env.ref("base.state_us_35").id])]
+        self.holiday_model_line.create(
+            [
+                {"name": "holiday x", "date": "1994-11-14", "year_id": holiday4.id},
+                {
+                    "name": "holiday y",
+                    "date": "1994-11-14",
+                    "year_id": holiday4.id,
+                    "state_ids": state_ids,
+                },
+            ]
+        )
+        with self.assertRaises(ValidationError):
+            self.holiday_model_line.create(
+                [
+                    {
+                        "name": "holiday z",
+                        "date": "1994-11-15",
+                        "year_id": holiday4.id,
+                        "state_ids": state_ids,
+                    },
+                    {
+                        "name": "holiday z",
+                        "date": "1994-11-15",
+                        "year_id": holiday4.id,
+                        "state_ids": state_ids,
+                    },
+                ]
+            )
+        with self.assertRaises(ValidationError):
+            self.holiday_model.create(
+                [
+                    {"year": 1993, "country_id": self.env.ref("base.us").id},
+                    {"year": 1993, "country_id": self.env.ref("base.us").id},
+                ]
+            )
+
+    def test_national_flag(self):
+        line = self.holiday1.line_ids[0]
+        self.assertTrue(line.national)
+        line.state_ids = [(6, 0, [self.env.ref("base.state_us_35").id])]
+        self.assertFalse(line.national)
+        line.state_ids = [(5,)]
+        self.assertTrue(line.national)
+
+    def test_holidays_bitmap(self):
+        bitmap_model = self.env["hr.holidays.public.bitmap"]
+        bitmap = bitmap_model._get_bitmap(self.env.ref("base.sl").id, False, 1994)
+        self.assertEqual(len(bitmap), 366)
+        self.assertEqual(bitmap.count("1"), 1)
+        self.assertEqual(bitmap[date(1994, 10, 14).timetuple().tm_yday - 1], "1")
+        bitmap = bitmap_model._get_bitmap(self.env.ref("base.us").id, False, 1995)
+        self.assertEqual(bitmap.count("1"), 3)
+        self.assertFalse(bitmap_model._get_bitmap(False, False, 1990))
+        self.holiday1.line_ids.unlink()
+        self.assertFalse(
+            bitmap_model._get_bitmap(self.env.ref("base.us").id, False, 1995)
+        )
+
+    @mute_logger("odoo.sql_db")
+    def test_holidays_bitmap_unique(self):
+        bitmap_model = self.env["hr.holidays.public.bitmap"]
+        bitmap = bitmap_model.search([("year", "=", 1995)], limit=1)
+        self.assertFalse(bitmap.country_id)
+        with self.assertRaises(IntegrityError), self.env.cr.savepoint():
+            bitmap.copy()
+
+    def test_holidays_bitmap_refresh_regions(self):
+        bitmap_model = self.env["hr.holidays.public.bitmap"]
+        sl_rows = bitmap_model.search(
+            [("year", "=", 1994), ("country_id", "=", self.env.ref("base.sl").id)]
+        )
+        sk_rows = bitmap_model.search(
+            [("year", "=", 1994), ("country_id", "=", self.env.ref("base.sk").id)]
+        )
+        self.assertTrue(sl_rows and sk_rows)
+        holiday_sk = self.holiday_model.search(
+            [("year", "=", 1994), ("country_id", "=", self.env.ref("base.sk").id)]
+        )
+        self.holiday_model_line.create(
+            {"name": "holiday 7", "date": "1994-12-14", "year_id": holiday_sk.id}
+        )
+        # Only the bitmaps of the changed country are rebuilt
+        self.assertTrue(sl_rows.exists())
+        self.assertFalse(sk_rows.exists())
+        bitmap = bitmap_model._get_bitmap(self.env.ref("base.sk").id, False, 1994)
+        self.assertEqual(bitmap.count("1"), 2)
+        # Holidays without country are part of the bitmaps of every country
+        holiday = self.holiday_model.create({"year": 1994})
+        self.holiday_model_line.create(
+            {"name": "holiday 8", "date": "1994-01-01", "year_id": holiday.id}
+        )
+        self.assertFalse(sl_rows.exists())
+        bitmap = bitmap_model._get_bitmap(self.env.ref("base.sl").id, False, 1994)
+        self.assertEqual(bitmap.count("1"), 2)
+
     def test_isnot_holiday(self):
         # ensures that if given a date that is not an holiday it returns none
         self.assertFalse(self.holiday_model.is_public_holiday(date(1995, 12, 10)))
@@ -101,6 +205,18 @@ class TestHolidaysPublic(TransactionCase):
         # ensures that correct holidays are identified
         self.assertTrue(self.holiday_model.is_public_holiday(date(1995, 10, 14)))
 
+    def test_public_holidays_mask(self):
+        dates = [date(1994, 10, 14), date(1994, 11, 14), date(1995, 10, 15)]
+        self.assertEqual(
+            self.holiday_model.public_holidays_mask(dates), [True, True, False]
+        )
+        self.assertEqual(
+            self.holiday_model.public_holidays_mask(
+                dates, employee_id=self.employee.id
+            ),
+            [True, False, False],
+        )
+
     def test_isnot_holiday_in_country(self):
         # ensures that correct holidays are identified for a country
         self.assertFalse(
@@ -117,6 +233,64 @@ class TestHolidaysPublic(TransactionCase):
             )
         )
 
+    def test_holidays_index_cache(self):
+        # ensures that the cached index is refreshed when holidays change
+        dates = self.holiday_model._get_holidays_dates(None, False, 1995)
+        self.assertEqual(len(dates), 3)
+        with self.assertQueryCount(0):
+            self.holiday_model._get_holidays_dates(None, False, 1995)
+        line = self.holiday_model_line.create(
+            {"name": "holiday y", "date": "1995-05-01", "year_id": self.holiday1.id}
+        )
+        self.assertTrue(self.holiday_model.is_public_holiday(date(1995, 5, 1)))
+        line.date = "1995-05-02"
+        self.assertFalse(self.holiday_model.is_public_holiday(date(1995, 5, 1)))
+        line.unlink()
+        self.assertFalse(self.holiday_model.is_public_holiday(date(1995, 5, 2)))
+        self.holiday1.country_id = self.env.ref("base.sk")
+        self.assertFalse(
+            self.holiday_model.is_public_holiday(
+                date(1995, 10, 14), employee_id=self.employee.id
+            )
+        )
+
+    def test_employee_holidays_region(self):
+        self.assertEqual(self.employee.holidays_country_id, self.env.ref("base.sl"))
+        self.assertFalse(self.employee.holidays_state_id)
+        self.employee.address_id.write(
+            {
+                "country_id": self.env.ref("base.us").id,
+                "state_id": self.env.ref("base.state_us_35").id,
+            }
+        )
+        self.assertEqual(self.employee.holidays_country_id, self.env.ref("base.us"))
+        self.assertEqual(
+            self.employee.holidays_state_id, self.env.ref("base.state_us_35")
+        )
+
+    def test_get_holidays_map(self):
+        employee_2 = self.employee_model.create(
+            {
+                "name": "Employee 2",
+                "address_id": self.env["res.partner"]
+                .create(
+                    {"name": "Employee 2", "country_id": self.env.ref("base.sk").id}
+                )
+                .id,
+            }
+        )
+        employee_3 = self.employee_model.create({"name": "Employee 3"})
+        res = self.holiday_model.get_holidays_map(
+            [self.employee.id, employee_2.id, employee_3.id],
+            date(1994, 1, 1),
+            date(1995, 10, 31),
+        )
+        self.assertEqual(
+            res[self.employee.id], {date(1994, 10, 14)} | res[employee_3.id]
+        )
+        self.assertEqual(res[employee_2.id], {date(1994, 11, 14)} | res[employee_3.id])
+        self.assertEqual(res[employee_3.id], {date(1995, 1, 1), date(1995, 10, 14)})
+
     def test_holiday_line_year(self):
         # ensures that line year and holiday year are the same
         holiday4 = self.holiday_model.create({"year": 1994})
@@ -191,6 +365,43 @@ class TestHolidaysPublic(TransactionCase):
         with self.assertRaises(UserError):
             wz_create_ph.create_public_holidays()
 
+    def test_create_several_years_public_holidays(self):
+        wizard = self.wizard_next_year.create({"year": 2001, "years_count": 3})
+        wizard.action_preview()
+        self.assertEqual(len(wizard.preview_line_ids), 15)
+        self.assertFalse(self.holiday_model.get_holidays_list(2001))
+        wizard.create_public_holidays()
+        for year in (2001, 2002, 2003):
+            self.assertEqual(len(self.holiday_model.get_holidays_list(year)), 5)
+        self.assertFalse(self.holiday_model.get_holidays_list(2004))
+
+    def test_february_29th_policy(self):
+        holiday_tw_2016 = self.holiday_model.create(
+            {"year": 2016, "country_id": self.env.ref("base.tw").id}
+        )
+        self.holiday_model_line.create(
+            {
+                "name": "Peace Memorial Holiday",
+                "date": "2016-02-29",
+                "year_id": holiday_tw_2016.id,
+            }
+        )
+        wizard = self.wizard_next_year.create(
+            {
+                "template_ids": [(6, 0, holiday_tw_2016.ids)],
+                "years_count": 4,
+                "feb_29_policy": "mar_1",
+            }
+        )
+        wizard.create_public_holidays()
+        lines = self.holiday_model.get_holidays_list(
+            start_dt=date(2017, 1, 1), end_dt=date(2020, 12, 31)
+        )
+        self.assertEqual(
+            lines.mapped("date"),
+            [date(2017, 3, 1), date(2018, 3, 1), date(2019, 3, 1), date(2020, 2, 29)],
+        )
+
     def test_calendar_event_created(self):
         holiday = self.holiday_model.create(
             {"year": 2019, "country_id": self.env.ref("base.us").id}
@@ -202,3 +413,114 @@ class TestHolidaysPublic(TransactionCase):
         self.assertTrue(meeting_id)
         hline.unlink()
         self.assertFalse(meeting_id.exists())
+
+    def test_calendar_event_created_multi(self):
+        holiday = self.holiday_model.create(
+            {"year": 2019, "country_id": self.env.ref("base.us").id}
+        )
+        hlines = self.holiday_model_line.create(
+            [
+                {"name": "holiday x", "date": "2019-07-30", "year_id": holiday.id},
+                {"name": "holiday y", "date": "2019-08-30", "year_id": holiday.id},
+            ]
+        )
+        meetings = hlines.mapped("meeting_id")
+        self.assertEqual(len(meetings), 2)
+        for hline in hlines:
+            self.assertEqual(hline.meeting_id.start.date(), hline.date)
+
+    def test_calendar_event_deferred_sync(self):
+        self.env["ir.config_parameter"].sudo().set_param(
+            "hr_holidays_public.defer_calendar_sync", "True"
+        )
+        hline = self.holiday1.line_ids[0]
+        hline.name = "holiday renamed"
+        self.assertTrue(hline.meeting_to_sync)
+        self.assertEqual(hline.meeting_id.name, "holiday x")
+        changes = hline._get_holidays_meeting_changes()
+        self.assertIn("name", changes)
+        self.assertNotIn("description", changes)
+        self.assertNotIn("categ_ids", changes)
+        other_hline = self.holiday1.line_ids[1]
+        other_hline.name = "other holiday renamed"
+        self.assertTrue(other_hline.meeting_to_sync)
+        # All the batches are processed in a single run
+        self.holiday_model_line._cron_sync_calendar_events(limit=1, autocommit=False)
+        self.assertFalse(hline.meeting_to_sync)
+        self.assertFalse(other_hline.meeting_to_sync)
+        self.assertEqual(hline.meeting_id.name, "holiday renamed")
+        self.assertEqual(other_hline.meeting_id.name, "other holiday renamed")
+
+    def test_calendar_event_aggregated(self):
+        holiday = self.holiday_model.create(
+            {"year": 2019, "country_id": self.env.ref("base.us").id}
+        )
+        hlines = self.holiday_model_line.create(
+            [
+                {
+                    "name": "holiday x",
+                    "date": "2019-07-30",
+                    "year_id": holiday.id,
+                    "state_ids": [(6, 0, [self.env.ref("base.state_us_35").id])],
+                },
+                {"name": "holiday y", "date": "2019-07-30", "year_id": holiday.id},
+            ]
+        )
+        old_meetings = hlines.mapped("meeting_id")
+        self.assertEqual(len(old_meetings), 2)
+        self.env["ir.config_parameter"].sudo().set_param(
+            "hr_holidays_public.calendar_event_mode", "aggregated"
+        )
+        hlines._rebuild_holidays_meetings()
+        meeting = hlines.mapped("meeting_id")
+        self.assertEqual(len(meeting), 1)
+        self.assertEqual(old_meetings.exists(), meeting)
+        self.assertEqual(meeting.name, "holiday x, holiday y (United States)")
+        hline = self.holiday_model_line.create(
+            {"name": "holiday z", "date": "2019-07-31", "year_id": holiday.id}
+        )
+        self.assertNotEqual(hline.meeting_id, meeting)
+        hline.date = "2019-07-30"
+        self.assertEqual(hline.meeting_id, meeting)
+        hlines[0].unlink()
+        self.assertTrue(meeting.exists())
+        self.assertEqual(meeting.name, "holiday y, holiday z (United States)")
+        self.env["ir.config_parameter"].sudo().set_param(
+            "hr_holidays_public.calendar_event_mode", "line"
+        )
+        (hlines[1] | hline)._rebuild_holidays_meetings()
+        self.assertEqual(len((hlines[1] | hline).mapped("meeting_id")), 2)
+        self.assertFalse(meeting.exists())
+
+    def test_calendar_event_aggregated_deferred_sync(self):
+        config = self.env["ir.config_parameter"].sudo()
+        config.set_param("hr_holidays_public.calendar_event_mode", "aggregated")
+        config.set_param("hr_holidays_public.defer_calendar_sync", "True")
+        holiday = self.holiday_model.create(
+            {"year": 2019, "country_id": self.env.ref("base.us").id}
+        )
+        hlines = self.holiday_model_line.create(
+            [
+                {"name": "holiday x", "date": "2019-07-30", "year_id": holiday.id},
+                {
+                    "name": "holiday y",
+                    "date": "2019-07-30",
+                    "year_id": holiday.id,
+                    "state_ids": [(6, 0, [self.env.ref("base.state_us_35").id])],
+                },
+            ]
+        )
+        meeting = hlines.mapped("meeting_id")
+        self.assertEqual(len(meeting), 1)
+        hlines[1].date = "2019-07-31"
+        # The meetings are only regrouped by the scheduled action
+        self.assertEqual(hlines.mapped("meeting_to_sync"), [True, True])
+        self.assertEqual(hlines.mapped("meeting_id"), meeting)
+        self.holiday_model_line._cron_sync_calendar_events(autocommit=False)
+        self.assertEqual(hlines.mapped("meeting_to_sync"), [False, False])
+        self.assertEqual(len(hlines.mapped("meeting_id")), 2)
+        self.assertEqual(
+            hlines.mapped("meeting_id.name"),
+            ["holiday x (United States)", "holiday y (United States)"],
+        )
+        self.assertEqual(hlines[1].meeting_id.start.date(), date(2019, 7, 31))
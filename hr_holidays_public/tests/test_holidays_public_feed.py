@@ -0,0 +1,81 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+import json
+
+from odoo.tests.common import HttpCase, tagged
+
+
+@tagged("post_install", "-at_install")
+class TestHolidaysPublicFeed(HttpCase):
+    def setUp(self):
+        super().setUp()
+        self.holiday = self.env["hr.holidays.public"].create(
+            {
+                "year": 1946,
+                "country_id": self.env.ref("base.es").id,
+                "line_ids": [
+                    (0, 0, {"name": "Christmas", "date": "1946-12-25"}),
+                    (
+                        0,
+                        0,
+                        {
+                            "name": "Regional",
+                            "date": "1946-12-23",
+                            "state_ids": [(6, 0, self.env.ref("base.state_es_cr").ids)],
+                        },
+                    ),
+                ],
+            }
+        )
+        self.url = (
+            "/hr_holidays_public/holidays.%s?country=ES"
+            "&date_from=1946-01-01&date_to=1946-12-31"
+        )
+
+    def test_feed_json(self):
+        response = self.url_open(self.url % "json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [holiday["name"] for holiday in json.loads(response.text)], ["Christmas"],
+        )
+        response = self.url_open((self.url % "json") + "&state=CR")
+        self.assertEqual(len(json.loads(response.text)), 2)
+
+    def test_feed_ics(self):
+        response = self.url_open(self.url % "ics")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("DTSTART;VALUE=DATE:19461225", response.text)
+        self.assertIn("SUMMARY:Christmas", response.text)
+
+    def test_feed_etag(self):
+        response = self.url_open(self.url % "json")
+        etag = response.headers["ETag"]
+        response = self.url_open(self.url % "json", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.holiday.line_ids[0].name = "Christmas Day"
+        response = self.url_open(self.url % "json", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertIn("Christmas Day", response.text)
+
+    def test_feed_range(self):
+        url = "/hr_holidays_public/holidays.json?country=ES&date_from=%s&date_to=%s"
+        response = self.url_open(url % ("0001-01-01", "9999-12-31"))
+        self.assertEqual(response.status_code, 400)
+        response = self.url_open(url % ("1946-12-31", "1946-01-01"))
+        self.assertEqual(response.status_code, 400)
+        response = self.url_open(url % ("1946-13-01", "1946-12-31"))
+        self.assertEqual(response.status_code, 400)
+        response = self.url_open(url % ("1937-01-01", "1946-12-31"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_feed_region_codes(self):
+        url = (
+            "/hr_holidays_public/holidays.json?date_from=1946-01-01&date_to=1946-12-31"
+        )
+        response = self.url_open(url + "&country=es&state=cr")
+        self.assertEqual(len(json.loads(response.text)), 2)
+        response = self.url_open(url + "&country=%25")
+        self.assertEqual(response.status_code, 400)
+        response = self.url_open(url + "&country=ES&state=_R")
+        self.assertEqual(response.status_code, 400)
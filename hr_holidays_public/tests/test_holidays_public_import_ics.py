@@ -0,0 +1,89 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+import base64
+from datetime import date
+
+from odoo.exceptions import UserError
+from odoo.tests.common import TransactionCase
+
+ICS_FILE = """BEGIN:VCALENDAR
+VERSION:2.0
+BEGIN:VEVENT
+DTSTART;VALUE=DATE:20210101
+DTEND;VALUE=DATE:20210102
+SUMMARY:New Year\\, first day
+END:VEVENT
+BEGIN:VEVENT
+DTSTART;VALUE=DATE:20210101
+SUMMARY:New Year duplicate
+END:VEVENT
+BEGIN:VEVENT
+DTSTART;VALUE=DATE:20210215
+SUMMARY:Regional
+ holiday
+LOCATION:NY\\,CA
+END:VEVENT
+BEGIN:VEVENT
+DTSTART;VALUE=DATE:20211224
+DTEND;VALUE=DATE:20211227
+SUMMARY:Christmas
+END:VEVENT
+BEGIN:VEVENT
+DTSTART;VALUE=DATE:20220101
+SUMMARY:New Year
+END:VEVENT
+END:VCALENDAR
+"""
+
+
+class TestHolidaysPublicImportIcs(TransactionCase):
+    at_install = False
+    post_install = True
+
+    def setUp(self):
+        super().setUp()
+        self.us = self.env.ref("base.us")
+        self.holiday_model = self.env["hr.holidays.public"]
+
+    def test_import_ics(self):
+        existing = self.holiday_model.create(
+            {
+                "year": 2021,
+                "country_id": self.us.id,
+                "line_ids": [(0, 0, {"name": "Christmas", "date": "2021-12-25"})],
+            }
+        )
+        wizard = self.env["public.holidays.import.ics.wizard"].create(
+            {
+                "ics_file": base64.b64encode(ICS_FILE.encode()),
+                "country_id": self.us.id,
+                "state_property": "location",
+            }
+        )
+        wizard.action_import()
+        self.assertEqual(
+            existing.line_ids.mapped("date"),
+            [
+                date(2021, 1, 1),
+                date(2021, 2, 15),
+                date(2021, 12, 24),
+                date(2021, 12, 25),
+                date(2021, 12, 26),
+            ],
+        )
+        self.assertEqual(existing.line_ids[0].name, "New Year, first day")
+        regional = existing.line_ids[1]
+        self.assertEqual(regional.name, "Regional holiday")
+        self.assertEqual(sorted(regional.state_ids.mapped("code")), ["CA", "NY"])
+        holiday_2022 = self.holiday_model.search(
+            [("year", "=", 2022), ("country_id", "=", self.us.id)]
+        )
+        self.assertEqual(holiday_2022.line_ids.mapped("name"), ["New Year"])
+
+    def test_import_ics_invalid_date(self):
+        ics_file = ICS_FILE.replace("DTEND;VALUE=DATE:20211227", "DTEND:2021-12-27")
+        wizard = self.env["public.holidays.import.ics.wizard"].create(
+            {"ics_file": base64.b64encode(ics_file.encode()), "country_id": self.us.id}
+        )
+        with self.assertRaisesRegex(UserError, "Christmas"):
+            wizard.action_import()
@@ -0,0 +1,196 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from datetime import date
+
+from odoo.exceptions import ValidationError
+from odoo.tests.common import TransactionCase
+
+
+class TestHolidaysPublicRule(TransactionCase):
+    at_install = False
+    post_install = True
+
+    def setUp(self):
+        super().setUp()
+        self.holiday_model = self.env["hr.holidays.public"]
+        self.holiday = self.holiday_model.create(
+            {
+                "year": 2021,
+                "country_id": self.env.ref("base.us").id,
+                "rule_ids": [
+                    (0, 0, {"name": "New Year", "month": 1, "day": 1}),
+                    (
+                        0,
+                        0,
+                        {
+                            "name": "Easter Monday",
+                            "rule_type": "easter",
+                            "easter_offset": 1,
+                        },
+                    ),
+                    (
+                        0,
+                        0,
+                        {
+                            "name": "Thanksgiving",
+                            "rule_type": "weekday",
+                            "month": 11,
+                            "weekday": "3",
+                            "week_number": 4,
+                        },
+                    ),
+                    (
+                        0,
+                        0,
+                        {
+                            "name": "Memorial Day",
+                            "rule_type": "weekday",
+                            "month": 5,
+                            "weekday": "0",
+                            "week_number": -1,
+                        },
+                    ),
+                    (
+                        0,
+                        0,
+                        {
+                            "name": "Independence Day",
+                            "month": 7,
+                            "day": 4,
+                            "weekend_substitution": "nearest_weekday",
+                        },
+                    ),
+                ],
+            }
+        )
+
+    def test_rule_dates(self):
+        dates = self.holiday.rule_ids._get_dates([2021, 2022])
+        self.assertEqual(
+            [dates[rule.id][2021] for rule in self.holiday.rule_ids],
+            [
+                date(2021, 1, 1),
+                date(2021, 4, 5),
+                date(2021, 11, 25),
+                date(2021, 5, 31),
+                date(2021, 7, 5),
+            ],
+        )
+        self.assertEqual(
+            [dates[rule.id][2022] for rule in self.holiday.rule_ids],
+            [
+                date(2022, 1, 1),
+                date(2022, 4, 18),
+                date(2022, 11, 24),
+                date(2022, 5, 30),
+                date(2022, 7, 4),
+            ],
+        )
+
+    def test_rule_dates_substitution_collision(self):
+        holiday = self.holiday_model.create(
+            {
+                "year": 2021,
+                "country_id": self.env.ref("base.uk").id,
+                "rule_ids": [
+                    (
+                        0,
+                        0,
+                        {
+                            "name": "Boxing Day",
+                            "month": 12,
+                            "day": 26,
+                            "weekend_substitution": "next_monday",
+                        },
+                    ),
+                    (
+                        0,
+                        0,
+                        {
+                            "name": "Christmas Day",
+                            "month": 12,
+                            "day": 25,
+                            "weekend_substitution": "next_monday",
+                        },
+                    ),
+                ],
+            }
+        )
+        dates = holiday.rule_ids._get_dates([2021, 2022])
+        # Sunday and Saturday in 2021
+        self.assertEqual(
+            [dates[rule.id][2021] for rule in holiday.rule_ids],
+            [date(2021, 12, 28), date(2021, 12, 27)],
+        )
+        # Monday and Sunday in 2022
+        self.assertEqual(
+            [dates[rule.id][2022] for rule in holiday.rule_ids],
+            [date(2022, 12, 26), date(2022, 12, 27)],
+        )
+        holiday.action_generate_lines_from_rules()
+        self.assertEqual(
+            sorted(holiday.line_ids.mapped("date")),
+            [date(2021, 12, 27), date(2021, 12, 28)],
+        )
+
+    def test_rule_dates_substitution_manual_line(self):
+        holiday = self.holiday_model.create(
+            {
+                "year": 2021,
+                "country_id": self.env.ref("base.uk").id,
+                "line_ids": [(0, 0, {"name": "Manual", "date": "2021-12-27"})],
+                "rule_ids": [
+                    (
+                        0,
+                        0,
+                        {
+                            "name": "Christmas Day",
+                            "month": 12,
+                            "day": 25,
+                            "weekend_substitution": "next_monday",
+                        },
+                    ),
+                ],
+            }
+        )
+        holiday.action_generate_lines_from_rules()
+        self.assertEqual(
+            holiday.line_ids.filtered("rule_id").date, date(2021, 12, 28),
+        )
+
+    def test_rule_check(self):
+        with self.assertRaises(ValidationError):
+            self.holiday.rule_ids[0].month = 13
+        self.holiday.rule_ids[0].write({"month": 2, "day": 29})
+        with self.assertRaises(ValidationError):
+            self.holiday.rule_ids[0].day = 30
+        with self.assertRaises(ValidationError):
+            self.holiday.rule_ids[0].write({"month": 4, "day": 31})
+
+    def test_generate_lines_from_rules(self):
+        self.holiday.action_generate_lines_from_rules()
+        self.assertEqual(len(self.holiday.line_ids), 5)
+        self.assertEqual(self.holiday.line_ids.mapped("rule_id"), self.holiday.rule_ids)
+        # Generating again replaces the lines
+        self.holiday.rule_ids[0].unlink()
+        self.holiday.action_generate_lines_from_rules()
+        self.assertEqual(len(self.holiday.line_ids), 4)
+
+    def test_next_year_wizard_with_rules(self):
+        self.holiday.action_generate_lines_from_rules()
+        self.env["hr.holidays.public.line"].create(
+            {"name": "One shot", "date": "2021-06-01", "year_id": self.holiday.id}
+        )
+        wizard = self.env["public.holidays.next.year.wizard"].create(
+            {"template_ids": [(6, 0, self.holiday.ids)], "years_count": 2}
+        )
+        wizard.action_preview()
+        self.assertEqual(len(wizard.preview_line_ids), 12)
+        wizard.create_public_holidays()
+        holiday_2022 = self.holiday_model.search(
+            [("year", "=", 2022), ("country_id", "=", self.env.ref("base.us").id)]
+        )
+        self.assertEqual(len(holiday_2022.rule_ids), 5)
+        self.assertEqual(len(holiday_2022.line_ids), 6)
+        self.assertIn(date(2022, 4, 18), holiday_2022.line_ids.mapped("date"))
+        self.assertIn(date(2022, 6, 1), holiday_2022.line_ids.mapped("date"))
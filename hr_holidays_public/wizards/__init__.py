@@ -1,3 +1,5 @@
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
 from . import holidays_public_next_year_wizard
+from . import holidays_public_import_ics_wizard
+from . import holidays_public_recompute_leaves_wizard
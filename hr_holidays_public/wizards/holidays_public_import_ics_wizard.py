@@ -0,0 +1,215 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+import base64
+import io
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+
+from odoo import _, fields, models
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 500
+
+
+def _ics_unfold(stream):
+    """Yields the logical lines of an iCalendar stream, joining folded lines."""
+    current = None
+    for raw_line in stream:
+        line = raw_line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def _ics_unescape(value):
+    return (
+        value.replace("\\n", "\n")
+        .replace("\\N", "\n")
+        .replace("\\,", ",")
+        .replace("\\;", ";")
+        .replace("\\\\", "\\")
+    )
+
+
+def _ics_date(value):
+    return date(int(value[0:4]), int(value[4:6]), int(value[6:8]))
+
+
+def _ics_events(stream):
+    """Yields the properties of each VEVENT of an iCalendar stream as a dict
+    {property name: value}, reading the stream line by line."""
+    event = None
+    for line in _ics_unfold(stream):
+        name, _sep, value = line.partition(":")
+        name = name.split(";", 1)[0].upper()
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            event = {}
+        elif name == "END" and value.upper() == "VEVENT":
+            if event is not None:
+                yield event
+            event = None
+        elif event is not None:
+            event[name] = value
+
+
+class HolidaysPublicImportIcsWizard(models.TransientModel):
+    _name = "public.holidays.import.ics.wizard"
+    _description = "Imports public holidays from an iCalendar file"
+
+    ics_file = fields.Binary(string="iCalendar File", required=True)
+    ics_filename = fields.Char()
+    country_id = fields.Many2one(
+        comodel_name="res.country",
+        string="Country",
+        help="Country of the imported public holidays. Leave empty for global "
+        "public holidays.",
+    )
+    state_property = fields.Selection(
+        selection=[
+            ("none", "None"),
+            ("location", "Location"),
+            ("categories", "Categories"),
+        ],
+        string="States From",
+        default="none",
+        required=True,
+        help="Event property holding the codes of the country states the "
+        "public holiday applies to, separated by commas. Events without "
+        "states apply to the whole country.",
+    )
+
+    def _iter_lines_values(self, stream):
+        """Yields the values of a public holiday line for each day of each
+        event of the stream."""
+        states = {}
+        if self.state_property != "none":
+            states = {
+                state.code.upper(): state.id
+                for state in self.env["res.country.state"].search(
+                    [("country_id", "=", self.country_id.id)]
+                )
+            }
+        for event in _ics_events(stream):
+            if "DTSTART" not in event:
+                continue
+            name = _ics_unescape(event.get("SUMMARY", "")) or _("Public Holiday")
+            try:
+                date_from = _ics_date(event["DTSTART"])
+                date_to = date_from
+                if "DTEND" in event:
+                    date_to = max(
+                        _ics_date(event["DTEND"]) - timedelta(days=1), date_from
+                    )
+            except ValueError:
+                raise UserError(_("Invalid date in the event %s.") % name)
+            state_ids = set()
+            if self.state_property != "none":
+                codes = _ics_unescape(event.get(self.state_property.upper(), ""))
+                for code in codes.split(","):
+                    code = code.strip().upper()
+                    if not code:
+                        continue
+                    if code not in states:
+                        raise UserError(_("Unknown state code %s.") % code)
+                    state_ids.add(states[code])
+            while date_from <= date_to:
+                yield {"name": name, "date": date_from, "state_ids": state_ids}
+                date_from += timedelta(days=1)
+
+    def _import_chunk(self, chunk):
+        """Creates the public holiday lines of a chunk in a single batch,
+        skipping the ones already existing.
+        :return: tuple (hr.holidays.public records, number of created lines)
+        """
+        holiday_model = self.env["hr.holidays.public"]
+        line_model = self.env["hr.holidays.public.line"]
+        years = {vals["date"].year for vals in chunk}
+        holiday_by_year = {
+            holiday.year: holiday
+            for holiday in holiday_model.search(
+                [("year", "in", list(years)), ("country_id", "=", self.country_id.id)]
+            )
+        }
+        missing_years = sorted(years - set(holiday_by_year))
+        if missing_years:
+            for holiday in holiday_model.create(
+                [
+                    {"year": year, "country_id": self.country_id.id}
+                    for year in missing_years
+                ]
+            ):
+                holiday_by_year[holiday.year] = holiday
+        holidays = holiday_model.union(*holiday_by_year.values())
+        # Existing lines of the chunk dates, fetched in a single query
+        taken = defaultdict(list)
+        for line in line_model.search_read(
+            [
+                ("year_id", "in", holidays.ids),
+                ("date", "in", list({vals["date"] for vals in chunk})),
+            ],
+            ["year_id", "date", "state_ids"],
+        ):
+            taken[(line["year_id"][0], line["date"])].append(set(line["state_ids"]))
+        vals_list = []
+        for vals in chunk:
+            holiday = holiday_by_year[vals["date"].year]
+            key = (holiday.id, vals["date"])
+            state_ids = vals["state_ids"]
+            if any(
+                (not state_ids and not other_state_ids) or state_ids & other_state_ids
+                for other_state_ids in taken[key]
+            ):
+                continue
+            taken[key].append(state_ids)
+            vals_list.append(
+                {
+                    "name": vals["name"],
+                    "date": vals["date"],
+                    "year_id": holiday.id,
+                    "state_ids": [(6, 0, list(state_ids))],
+                }
+            )
+        line_model.create(vals_list)
+        return holidays, len(vals_list)
+
+    def action_import(self):
+        self.ensure_one()
+        stream = io.TextIOWrapper(
+            io.BytesIO(base64.b64decode(self.ics_file)), encoding="utf-8-sig"
+        )
+        holidays = self.env["hr.holidays.public"]
+        read = created = 0
+        chunk = []
+        for vals in self._iter_lines_values(stream):
+            chunk.append(vals)
+            read += 1
+            if len(chunk) >= CHUNK_SIZE:
+                chunk_holidays, chunk_created = self._import_chunk(chunk)
+                holidays |= chunk_holidays
+                created += chunk_created
+                chunk = []
+        if chunk:
+            chunk_holidays, chunk_created = self._import_chunk(chunk)
+            holidays |= chunk_holidays
+            created += chunk_created
+        _logger.info(
+            "Imported %s public holidays from %s, %s already existing",
+            created,
+            self.ics_filename or "iCalendar file",
+            read - created,
+        )
+        return {
+            "type": "ir.actions.act_window",
+            "name": _("Imported public holidays"),
+            "view_mode": "tree,form",
+            "res_model": "hr.holidays.public",
+            "domain": [("id", "in", holidays.ids)],
+        }
@@ -1,7 +1,9 @@
 # Copyright 2016 Trobz
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
+import calendar
 import logging
+from datetime import date
 
 from odoo import _, fields, models
 from odoo.exceptions import UserError
@@ -26,11 +28,33 @@ class HolidaysPublicNextYearWizard(models.TransientModel):
         help="Year for which you want to create the public holidays. "
         "By default, the year following the template."
     )
+    years_count = fields.Integer(
+        string="Number of Years",
+        default=1,
+        help="Number of consecutive years for which public holidays are created, "
+        "starting from the year above.",
+    )
+    feb_29_policy = fields.Selection(
+        selection=[
+            ("error", "Raise an error"),
+            ("feb_28", "Move to 28th of February"),
+            ("mar_1", "Move to 1st of March"),
+            ("skip", "Skip the public holiday"),
+        ],
+        string="29th of February",
+        default="error",
+        required=True,
+        help="What to do with public holidays on 29th of February when the "
+        "target year is not a leap year.",
+    )
+    preview_line_ids = fields.One2many(
+        comodel_name="public.holidays.next.year.wizard.line",
+        inverse_name="wizard_id",
+        string="Preview",
+        readonly=True,
+    )
 
-    def create_public_holidays(self):
-
-        self.ensure_one()
-
+    def _get_last_templates(self):
         last_ph_dict = {}
 
         ph_env = self.env["hr.holidays.public"]
@@ -54,40 +78,105 @@ class HolidaysPublicNextYearWizard(models.TransientModel):
             else:
                 last_ph_dict[ph.country_id] = ph
 
-        new_ph_ids = []
-        for last_ph in last_ph_dict.values():
-
-            new_year = self.year or last_ph.year + 1
-
-            new_ph_vals = {"year": new_year}
-
-            new_ph = last_ph.copy(new_ph_vals)
-
-            new_ph_ids.append(new_ph.id)
-
-            for last_ph_line in last_ph.line_ids:
-                feb_29 = last_ph_line.date.month == 2 and last_ph_line.date.day == 29
-
-                if feb_29:
-                    # Handling this rare case would mean quite a lot of
-                    # complexity because previous or next day might also be a
-                    # public holiday.
-                    raise UserError(
-                        _(
-                            "You cannot use as template the public holidays "
-                            "of a year that "
-                            "includes public holidays on 29th of February "
-                            "(2016, 2020...), please select a template from "
-                            "another year."
-                        )
+        return last_ph_dict.values()
+
+    def _get_new_date(self, old_date, new_year):
+        """Returns the date of a public holiday in the new year, or False if
+        the public holiday has to be skipped."""
+        feb_29 = old_date.month == 2 and old_date.day == 29
+        if not feb_29 or calendar.isleap(new_year):
+            return old_date.replace(year=new_year)
+        if self.feb_29_policy == "error":
+            # Handling this rare case would mean quite a lot of
+            # complexity because previous or next day might also be a
+            # public holiday.
+            raise UserError(
+                _(
+                    "You cannot use as template the public holidays "
+                    "of a year that "
+                    "includes public holidays on 29th of February "
+                    "(2016, 2020...), please select a template from "
+                    "another year."
+                )
+            )
+        if self.feb_29_policy == "feb_28":
+            return date(new_year, 2, 28)
+        if self.feb_29_policy == "mar_1":
+            return date(new_year, 3, 1)
+        return False
+
+    def _prepare_public_holidays_values(self):
+        """Returns the values for creating all the public holidays, with their
+        lines as one2many commands."""
+        self.ensure_one()
+        vals_list = []
+        for last_ph in self._get_last_templates():
+            start_year = self.year or last_ph.year + 1
+            for new_year in range(start_year, start_year + max(self.years_count, 1)):
+                new_ph_vals = last_ph.copy_data({"year": new_year})[0]
+                line_commands = []
+                for last_ph_line in last_ph.line_ids:
+                    if last_ph_line.rule_id:
+                        # Generated again from the copied rules
+                        continue
+                    new_date = self._get_new_date(last_ph_line.date, new_year)
+                    if not new_date:
+                        continue
+                    new_ph_line_vals = last_ph_line.copy_data({"date": new_date})[0]
+                    new_ph_line_vals.pop("year_id", None)
+                    line_commands.append((0, 0, new_ph_line_vals))
+                new_ph_vals["line_ids"] = line_commands
+                vals_list.append(new_ph_vals)
+        return vals_list
+
+    def action_preview(self):
+        self.ensure_one()
+        preview_commands = [(5, 0, 0)]
+        rule_model = self.env["hr.holidays.public.rule"]
+        for new_ph_vals in self._prepare_public_holidays_values():
+            lines_vals = [vals for _command, _id, vals in new_ph_vals["line_ids"]]
+            rules = rule_model
+            for _command, _id, rule_vals in new_ph_vals.get("rule_ids", []):
+                rules |= rule_model.new(rule_vals)
+            dates = rules._get_dates(
+                [new_ph_vals["year"]], [vals["date"] for vals in lines_vals]
+            )
+            for rule in rules:
+                rule_date = dates[rule.id].get(new_ph_vals["year"])
+                if rule_date:
+                    lines_vals.append(rule._prepare_line_values(rule_date))
+            for new_ph_line_vals in lines_vals:
+                preview_commands.append(
+                    (
+                        0,
+                        0,
+                        {
+                            "year": new_ph_vals["year"],
+                            "country_id": new_ph_vals.get("country_id"),
+                            "date": new_ph_line_vals["date"],
+                            "name": new_ph_line_vals["name"],
+                            "state_ids": new_ph_line_vals.get("state_ids"),
+                        },
                     )
+                )
+        self.preview_line_ids = preview_commands
+        return {
+            "type": "ir.actions.act_window",
+            "name": _("Create Next Year Public Holidays"),
+            "view_mode": "form",
+            "res_model": self._name,
+            "res_id": self.id,
+            "target": "new",
+        }
 
-                new_date = last_ph_line.date.replace(year=new_year)
-
-                new_ph_line_vals = {"date": new_date, "year_id": new_ph.id}
-                last_ph_line.copy(new_ph_line_vals)
+    def create_public_holidays(self):
+        self.ensure_one()
+        new_phs = self.env["hr.holidays.public"].create(
+            self._prepare_public_holidays_values()
+        )
+        new_phs.filtered("rule_ids")._generate_lines_from_rules()
 
-        domain = [["id", "in", new_ph_ids]]
+        domain = [["id", "in", new_phs.ids]]
 
         action = {
             "type": "ir.actions.act_window",
@@ -98,3 +187,26 @@ class HolidaysPublicNextYearWizard(models.TransientModel):
         }
 
         return action
+
+
+class HolidaysPublicNextYearWizardLine(models.TransientModel):
+    _name = "public.holidays.next.year.wizard.line"
+    _description = "Preview of public holidays to create"
+    _order = "year, country_id, date"
+
+    wizard_id = fields.Many2one(
+        comodel_name="public.holidays.next.year.wizard",
+        required=True,
+        ondelete="cascade",
+    )
+    year = fields.Integer("Calendar Year")
+    country_id = fields.Many2one("res.country", "Country")
+    date = fields.Date()
+    name = fields.Char()
+    state_ids = fields.Many2many(
+        comodel_name="res.country.state",
+        relation="public_holidays_next_year_wizard_line_state_rel",
+        column1="line_id",
+        column2="state_id",
+        string="Related States",
+    )
@@ -0,0 +1,89 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+import logging
+
+from odoo import _, fields, models
+
+_logger = logging.getLogger(__name__)
+
+
+class HolidaysPublicRecomputeLeavesWizard(models.TransientModel):
+    _name = "public.holidays.recompute.leaves.wizard"
+    _description = "Recompute the leaves affected by public holidays changes"
+
+    change_count = fields.Integer(
+        string="Pending Changes", default=lambda self: self._default_change_count()
+    )
+    preview_line_ids = fields.One2many(
+        comodel_name="public.holidays.recompute.leaves.wizard.line",
+        inverse_name="wizard_id",
+        readonly=True,
+    )
+
+    def _default_change_count(self):
+        return self.env["hr.holidays.public.change"].sudo().search_count([])
+
+    def _get_affected_leaves(self):
+        changes = self.env["hr.holidays.public.change"].sudo().search([])
+        leaves = self.env["hr.leave"]._get_public_holidays_affected_leaves(
+            changes._get_changes()
+        )
+        return changes, leaves
+
+    def action_preview(self):
+        self.ensure_one()
+        _changes, leaves = self._get_affected_leaves()
+        preview_commands = [(5, 0, 0)]
+        for leave, old_days, new_days in leaves._recompute_public_holidays_days(
+            dry_run=True
+        ):
+            preview_commands.append(
+                (
+                    0,
+                    0,
+                    {
+                        "leave_id": leave.id,
+                        "old_number_of_days": old_days,
+                        "new_number_of_days": new_days,
+                    },
+                )
+            )
+        self.preview_line_ids = preview_commands
+        return {
+            "type": "ir.actions.act_window",
+            "name": _("Recompute Leaves"),
+            "view_mode": "form",
+            "res_model": self._name,
+            "res_id": self.id,
+            "target": "new",
+        }
+
+    def action_recompute(self):
+        self.ensure_one()
+        changes, leaves = self._get_affected_leaves()
+        diff = leaves._recompute_public_holidays_days()
+        changes.unlink()
+        _logger.info(
+            "Recomputed %s leaves after %s public holidays changes, %s updated",
+            len(leaves),
+            len(changes),
+            len(diff),
+        )
+        return {"type": "ir.actions.act_window_close"}
+
+
+class HolidaysPublicRecomputeLeavesWizardLine(models.TransientModel):
+    _name = "public.holidays.recompute.leaves.wizard.line"
+    _description = "Preview of leaves durations to update"
+
+    wizard_id = fields.Many2one(
+        comodel_name="public.holidays.recompute.leaves.wizard",
+        required=True,
+        ondelete="cascade",
+    )
+    leave_id = fields.Many2one("hr.leave", "Leave")
+    employee_id = fields.Many2one(related="leave_id.employee_id")
+    date_from = fields.Datetime(related="leave_id.date_from")
+    date_to = fields.Datetime(related="leave_id.date_to")
+    old_number_of_days = fields.Float("Current Duration (Days)")
+    new_number_of_days = fields.Float("New Duration (Days)")
@@ -8,6 +8,7 @@ setuptools.setup(
     description="Meta package for oca-hr-holidays Odoo addons",
     version=version,
     install_requires=[
+        'odoo13-addon-hr_holidays_calendar_stages',
         'odoo13-addon-hr_holidays_credit',
         'odoo13-addon-hr_holidays_leave_auto_approve',
         'odoo13-addon-hr_holidays_leave_repeated',